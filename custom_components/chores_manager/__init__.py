@@ -3,7 +3,7 @@
 Sinds fase 3c is dit de enige app. De opzet is klein gehouden:
 
 - eigen SQLite-database (zie const.DB_FILENAME), alle toegang via db/;
-- tien WS-commando's (websocket.py) met push via de dispatcher;
+- elf WS-commando's (websocket.py) met push via de dispatcher;
 - één overzichtssensor (sensor.py), zonder polling;
 - nachtelijke rol om 03:00 (scheduler.py);
 - meldingen om 08:00 en zondag 20:00 plus de "Klaar"-knop (notify.py, fase 4);
@@ -14,6 +14,7 @@ op 28-07-2026 verwijderd; het terugvalpunt is de tag/branch v1-final.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from homeassistant.config_entries import ConfigEntry
@@ -21,13 +22,16 @@ from homeassistant.core import HomeAssistant, ServiceCall
 
 from .const import (
     DATA_DB_PATH,
+    DATA_SERVICES,
     DATA_UNSUB_NOTIFY,
     DATA_UNSUB_ROLL,
+    DATA_WRITE_LOCK,
     DATA_WS_REGISTERED,
     DB_FILENAME,
     DOMAIN,
     PLATFORMS,
 )
+from .db.connection import close_connections
 from .db.schema import create_database
 from .notify import async_send_daily, async_send_weekly, async_setup_notifications
 from .panel import async_remove_panel, async_setup_panel
@@ -46,6 +50,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
     domain_data = hass.data[DOMAIN]
     domain_data[DATA_DB_PATH] = database_path
+    # één schrijver tegelijk: WS-commando's, "Klaar"-knop en de rol
+    domain_data.setdefault(DATA_WRITE_LOCK, asyncio.Lock())
     domain_data.setdefault(entry.entry_id, {})
     domain_data[entry.entry_id][DATA_DB_PATH] = database_path
 
@@ -78,9 +84,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         verzonden = await async_send_weekly(hass, database_path)
         _LOGGER.info("Chores Manager: send_weekly_summary → %d meldingen", verzonden)
 
-    hass.services.async_register(DOMAIN, "roll_forward", handle_roll)
-    hass.services.async_register(DOMAIN, "send_daily_summary", handle_send_daily)
-    hass.services.async_register(DOMAIN, "send_weekly_summary", handle_send_weekly)
+    # wat hier geregistreerd wordt, ruimt async_unload_entry op; één lijst,
+    # zodat een nieuwe of hernoemde service niet uit de pas kan lopen
+    services = {
+        "roll_forward": handle_roll,
+        "send_daily_summary": handle_send_daily,
+        "send_weekly_summary": handle_send_weekly,
+    }
+    for service, handler in services.items():
+        hass.services.async_register(DOMAIN, service, handler)
+    domain_data[entry.entry_id][DATA_SERVICES] = list(services)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     _LOGGER.info("Chores Manager: setup compleet")
@@ -97,12 +110,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if unsub:
             unsub()
 
-    for service in ("roll_forward", "send_daily_summary", "send_weekly_summary"):
-        if hass.services.has_service(DOMAIN, service):
-            hass.services.async_remove(DOMAIN, service)
+    for service in entry_data.pop(DATA_SERVICES, ()):
+        hass.services.async_remove(DOMAIN, service)
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
+        await hass.async_add_executor_job(
+            close_connections, entry_data.get(DATA_DB_PATH))
         _LOGGER.info("Chores Manager: ontladen")
     return unload_ok
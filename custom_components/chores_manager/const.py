@@ -38,3 +38,6 @@ DATA_UNDO = "undo"
 DATA_WS_REGISTERED = "ws_registered"
 DATA_UNSUB_ROLL = "unsub_roll"
 DATA_UNSUB_NOTIFY = "unsub_notify"
+DATA_SERVICES = "services"
+DATA_WRITE_LOCK = "write_lock"
+DATA_STATE_CACHE = "state_cache"
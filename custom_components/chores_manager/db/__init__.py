@@ -7,8 +7,8 @@ nog bezette; op 28-07-2026 heeft het met een git mv de naam db/ overgenomen
 Alles hier is puur sqlite plus de scheduling-package — geen Home
 Assistant-imports, zodat de rooktests zonder HA-installatie draaien.
 """
-from .connection import get_connection
+from .connection import close_connections, get_connection
 from .errors import StoreError
 from .schema import apply_schema, create_database
 
-__all__ = ["get_connection", "apply_schema", "create_database", "StoreError"]
+__all__ = ["get_connection", "close_connections", "apply_schema", "create_database", "StoreError"]
@@ -45,20 +45,17 @@ def save_assignee(database_path: str, data: dict) -> dict:
         data.get("sort_order", 0),
     )
     with get_connection(database_path) as conn:
-        existing = conn.execute(
-            "SELECT id FROM assignees WHERE id = ?", (assignee_id,)).fetchone()
-        if existing:
-            conn.execute(
-                "UPDATE assignees SET name=?, color=?, ha_user_id=?, notify_service=?,"
-                " notifications_enabled=?, active=?, include_in_leaderboard=?,"
-                " sort_order=? WHERE id=?",
-                fields + (assignee_id,))
-        else:
-            conn.execute(
-                "INSERT INTO assignees (name, color, ha_user_id, notify_service,"
-                " notifications_enabled, active, include_in_leaderboard, sort_order, id)"
-                " VALUES (?,?,?,?,?,?,?,?,?)",
-                fields + (assignee_id,))
+        conn.execute(
+            "INSERT INTO assignees (name, color, ha_user_id, notify_service,"
+            " notifications_enabled, active, include_in_leaderboard, sort_order, id)"
+            " VALUES (?,?,?,?,?,?,?,?,?)"
+            " ON CONFLICT(id) DO UPDATE SET name=excluded.name, color=excluded.color,"
+            " ha_user_id=excluded.ha_user_id, notify_service=excluded.notify_service,"
+            " notifications_enabled=excluded.notifications_enabled,"
+            " active=excluded.active,"
+            " include_in_leaderboard=excluded.include_in_leaderboard,"
+            " sort_order=excluded.sort_order",
+            fields + (assignee_id,))
     return get_assignee(database_path, assignee_id)
 
 
@@ -79,11 +76,12 @@ def delete_assignee(database_path: str, assignee_id: str) -> str:
     een plek in een rotatielijst: deactiveren, zodat de historie (§3.4
     verwijst naar assignees.id) en de toewijzing niet loskomen. Geeft
     'deleted' of 'deactivated' terug."""
-    if assignee_in_use(database_path, assignee_id):
-        with get_connection(database_path) as conn:
+    # assignee_in_use krijgt binnen het blok dezelfde verbinding, dus de
+    # controle en de write gebeuren onder één schrijfslot
+    with get_connection(database_path, immediate=True) as conn:
+        if assignee_in_use(database_path, assignee_id):
             conn.execute(
                 "UPDATE assignees SET active = 0 WHERE id = ?", (assignee_id,))
-        return "deactivated"
-    with get_connection(database_path) as conn:
+            return "deactivated"
         conn.execute("DELETE FROM assignees WHERE id = ?", (assignee_id,))
         return "deleted"
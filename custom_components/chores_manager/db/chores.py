@@ -11,14 +11,25 @@ import sqlite3
 from datetime import date, timedelta
 from typing import Any, Optional
 
-from ..scheduling.calculator import initial_next_due, next_due_after_completion
+from ..scheduling.calculator import initial_next_due, next_due_after_completion, roll_forward
 from ..scheduling.types import validate_schedule
 from .connection import get_connection
 from .errors import StoreError
+from .subtasks import write_subtasks
 
 PRIORITIES = ("low", "normal", "high", "critical")
 ASSIGNMENT_TYPES = ("fixed", "rotating", "anyone")
 SUBTASK_MODES = (None, "checklist", "counter")
+SNOOZE_MODES = ("tomorrow", "skip")
+
+# Rangorde, belangrijkste eerst; één bron voor de sortering in Python
+# (tasks_today) en in SQL (list_due_chores), zodat sensor en ochtendmelding
+# niet uit elkaar lopen als er een prioriteit bij komt.
+PRIORITY_RANK = {p: rank for rank, p in enumerate(reversed(PRIORITIES))}
+_PRIORITY_RANK_SQL = (
+    "CASE priority "
+    + " ".join(f"WHEN '{p}' THEN {rank}" for p, rank in PRIORITY_RANK.items())
+    + f" ELSE {len(PRIORITY_RANK)} END")
 
 
 def row_to_chore(row: sqlite3.Row) -> dict:
@@ -38,19 +49,35 @@ def list_chores(database_path: str, include_inactive: bool = False) -> list[dict
         return [row_to_chore(r) for r in conn.execute(query)]
 
 
+def list_due_chores(database_path: str, today: date) -> list[dict]:
+    """Actieve taken die vandaag of eerder vervallen, belangrijkste eerst:
+    prioriteit, dan de kortste, dan naam. De volgorde van de ochtendmelding
+    (§6); SQLite sorteert, via idx_chores_active_due alleen het vervallen
+    deel."""
+    with get_connection(database_path) as conn:
+        return [row_to_chore(r) for r in conn.execute(
+            "SELECT * FROM chores WHERE active = 1 AND next_due <= ?"
+            f" ORDER BY {_PRIORITY_RANK_SQL}, duration_minutes, name",
+            (today.isoformat(),))]
+
+
 def get_chore(database_path: str, chore_id: str) -> Optional[dict]:
     with get_connection(database_path) as conn:
         row = conn.execute("SELECT * FROM chores WHERE id = ?", (chore_id,)).fetchone()
         return row_to_chore(row) if row else None
 
 
-def save_chore(database_path: str, data: dict, today: date, now_iso: str) -> dict:
+def save_chore(
+    database_path: str, data: dict, today: date, now_iso: str,
+    subtask_names: Optional[list[str]] = None,
+) -> dict:
     """Taak aanmaken of bijwerken (op id). Valideert alles vóór het schrijven.
 
     Bij een nieuwe taak zonder next_due wordt die berekend: eerste geplande
     keer op of na vandaag (interval: vandaag zelf). created_at en
     rotation_index blijven bij een update behouden, tenzij expliciet
-    meegegeven.
+    meegegeven. Met subtask_names worden ook de checklist-deeltaken
+    bijgewerkt (zie set_subtasks), in dezelfde transactie.
     """
     chore_id = (data.get("id") or "").strip()
     name = (data.get("name") or "").strip()
@@ -100,40 +127,41 @@ def save_chore(database_path: str, data: dict, today: date, now_iso: str) -> dic
     if next_due is None:
         next_due = initial_next_due(schedule_type, schedule_config, today).isoformat()
 
-    with get_connection(database_path) as conn:
-        existing = conn.execute(
-            "SELECT created_at, rotation_index FROM chores WHERE id = ?", (chore_id,)
-        ).fetchone()
-        rotation_index = data.get("rotation_index")
-        if rotation_index is None:
-            rotation_index = existing["rotation_index"] if existing else 0
-        fields = (
-            name, data.get("description", ""), data.get("icon", "📋"),
-            1 if data.get("active", 1) else 0,
-            schedule_type, json.dumps(schedule_config), next_due,
-            duration, priority,
-            assignment_type, assigned_to, json.dumps(rotation), rotation_index,
-            subtask_mode, subtask_target, now_iso,
-        )
-        if existing:
-            conn.execute(
-                "UPDATE chores SET name=?, description=?, icon=?, active=?,"
-                " schedule_type=?, schedule_config=?, next_due=?,"
-                " duration_minutes=?, priority=?,"
-                " assignment_type=?, assigned_to=?, rotation=?, rotation_index=?,"
-                " subtask_mode=?, subtask_target=?, updated_at=?"
-                " WHERE id=?",
-                fields + (chore_id,))
-        else:
-            conn.execute(
-                "INSERT INTO chores (name, description, icon, active,"
-                " schedule_type, schedule_config, next_due,"
-                " duration_minutes, priority,"
-                " assignment_type, assigned_to, rotation, rotation_index,"
-                " subtask_mode, subtask_target, updated_at, id, created_at)"
-                " VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
-                fields + (chore_id, now_iso))
-    return get_chore(database_path, chore_id)
+    # één upsert: created_at blijft bij een update staan (zit niet in de
+    # SET-lijst), rotation_index alleen als hij niet is meegegeven (COALESCE)
+    rotation_index = data.get("rotation_index")
+    fields = (
+        name, data.get("description", ""), data.get("icon", "📋"),
+        1 if data.get("active", 1) else 0,
+        schedule_type, json.dumps(schedule_config), next_due,
+        duration, priority,
+        assignment_type, assigned_to, json.dumps(rotation),
+        rotation_index if rotation_index is not None else 0,
+        subtask_mode, subtask_target, now_iso, chore_id, now_iso,
+    )
+    with get_connection(database_path, immediate=True) as conn:
+        conn.execute(
+            "INSERT INTO chores (name, description, icon, active,"
+            " schedule_type, schedule_config, next_due,"
+            " duration_minutes, priority,"
+            " assignment_type, assigned_to, rotation, rotation_index,"
+            " subtask_mode, subtask_target, updated_at, id, created_at)"
+            " VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+            " ON CONFLICT(id) DO UPDATE SET name=excluded.name,"
+            " description=excluded.description, icon=excluded.icon,"
+            " active=excluded.active, schedule_type=excluded.schedule_type,"
+            " schedule_config=excluded.schedule_config, next_due=excluded.next_due,"
+            " duration_minutes=excluded.duration_minutes, priority=excluded.priority,"
+            " assignment_type=excluded.assignment_type,"
+            " assigned_to=excluded.assigned_to, rotation=excluded.rotation,"
+            " rotation_index=COALESCE(?, rotation_index),"
+            " subtask_mode=excluded.subtask_mode,"
+            " subtask_target=excluded.subtask_target, updated_at=excluded.updated_at",
+            fields + (rotation_index,))
+        if subtask_names is not None:
+            write_subtasks(conn, chore_id, subtask_names)
+        row = conn.execute("SELECT * FROM chores WHERE id = ?", (chore_id,)).fetchone()
+        return row_to_chore(row)
 
 
 def delete_chore(database_path: str, chore_id: str) -> str:
@@ -142,7 +170,7 @@ def delete_chore(database_path: str, chore_id: str) -> str:
 
     Geeft 'deleted' of 'deactivated' terug.
     """
-    with get_connection(database_path) as conn:
+    with get_connection(database_path, immediate=True) as conn:
         history = conn.execute(
             "SELECT COUNT(*) FROM completions WHERE chore_id = ?", (chore_id,)
         ).fetchone()[0]
@@ -163,53 +191,68 @@ def restore_chore(database_path: str, chore_id: str, today: date, now_iso: str)
     een volle cyclus achterstand terugkrijgen). Terugzetten is een nieuwe
     start: interval begint vandaag, kalendertypen op de eerstvolgende
     geplande keer op of na vandaag."""
-    chore = get_chore(database_path, chore_id)
-    if chore is None:
-        raise StoreError(f"onbekende taak {chore_id!r}")
-    new_due = initial_next_due(
-        chore["schedule_type"], chore["schedule_config"], today)
-    with get_connection(database_path) as conn:
+    # get_chore krijgt binnen het blok dezelfde verbinding, dus lezen en
+    # schrijven gebeuren onder één schrijfslot
+    with get_connection(database_path, immediate=True) as conn:
+        chore = get_chore(database_path, chore_id)
+        if chore is None:
+            raise StoreError(f"onbekende taak {chore_id!r}")
+        new_due = initial_next_due(
+            chore["schedule_type"], chore["schedule_config"], today)
         conn.execute(
             "UPDATE chores SET active = 1, next_due = ?, updated_at = ? WHERE id = ?",
             (new_due.isoformat(), now_iso, chore_id))
-    return get_chore(database_path, chore_id)
-
-
-def set_next_due(database_path: str, chore_id: str, next_due: date, now_iso: str) -> None:
-    with get_connection(database_path) as conn:
-        conn.execute(
-            "UPDATE chores SET next_due = ?, updated_at = ? WHERE id = ?",
-            (next_due.isoformat(), now_iso, chore_id))
+        return get_chore(database_path, chore_id)
 
 
 def snooze_chore(database_path: str, chore_id: str, mode: str, today: date, now_iso: str) -> date:
     """§2.3 snooze: 'tomorrow' zet de taak op morgen; 'skip' slaat de komende
     geplande keer over en rolt door naar de eerstvolgende daarna."""
-    chore = get_chore(database_path, chore_id)
-    if chore is None:
-        raise StoreError(f"onbekende taak {chore_id!r}")
-    if mode == "tomorrow":
-        new_due = today + timedelta(days=1)
-    elif mode == "skip":
-        anchor = max(today, date.fromisoformat(chore["next_due"]))
-        new_due = next_due_after_completion(
-            chore["schedule_type"], chore["schedule_config"], anchor)
-    else:
-        raise StoreError(f"onbekende snooze-modus {mode!r}")
-    set_next_due(database_path, chore_id, new_due, now_iso)
+    with get_connection(database_path, immediate=True) as conn:
+        row = conn.execute("SELECT * FROM chores WHERE id = ?", (chore_id,)).fetchone()
+        if row is None:
+            raise StoreError(f"onbekende taak {chore_id!r}")
+        chore = row_to_chore(row)
+        if mode == "tomorrow":
+            new_due = today + timedelta(days=1)
+        elif mode == "skip":
+            anchor = max(today, date.fromisoformat(chore["next_due"]))
+            new_due = next_due_after_completion(
+                chore["schedule_type"], chore["schedule_config"], anchor)
+        else:
+            raise StoreError(f"onbekende snooze-modus {mode!r}")
+        conn.execute(
+            "UPDATE chores SET next_due = ?, updated_at = ? WHERE id = ?",
+            (new_due.isoformat(), now_iso, chore_id))
     return new_due
 
 
 def roll_all_forward(database_path: str, today: date, now_iso: str) -> list[tuple]:
     """De nachtelijke rol (§4.2) over alle actieve taken. Geeft per gewijzigde
     taak (id, oude next_due, nieuwe next_due) terug."""
-    from ..scheduling.calculator import roll_forward
-
     changes = []
-    for chore in list_chores(database_path):
-        old = date.fromisoformat(chore["next_due"])
-        new = roll_forward(chore["schedule_type"], chore["schedule_config"], old, today)
-        if new != old:
-            set_next_due(database_path, chore["id"], new, now_iso)
-            changes.append((chore["id"], old.isoformat(), new.isoformat()))
+    # Veel taken delen dezelfde config-tekst ("elke dag", "elke 7 dagen"):
+    # per rol één json.loads per verschillende tekst. roll_forward leest de
+    # dict alleen, dus delen is veilig.
+    configs: dict[str, dict] = {}
+    # lezen en schrijven op één verbinding, in één transactie: één commit
+    # voor de hele rol, en niemand die tussendoor een next_due verzet
+    with get_connection(database_path, immediate=True) as conn:
+        # next_due op of na vandaag blijft altijd staan (roll_forward), dus
+        # die rijen hoeven niet eens gelezen te worden
+        for row in conn.execute(
+                "SELECT id, schedule_type, schedule_config, next_due"
+                " FROM chores WHERE active = 1 AND next_due < ?"
+                " ORDER BY next_due, name", (today.isoformat(),)):
+            text = row["schedule_config"]
+            config = configs.get(text)
+            if config is None:
+                config = configs[text] = json.loads(text)
+            old = date.fromisoformat(row["next_due"])
+            new = roll_forward(row["schedule_type"], config, old, today)
+            if new != old:
+                changes.append((row["id"], old.isoformat(), new.isoformat()))
+        conn.executemany(
+            "UPDATE chores SET next_due = ?, updated_at = ? WHERE id = ?",
+            [(new, now_iso, chore_id) for chore_id, _old, new in changes])
     return changes
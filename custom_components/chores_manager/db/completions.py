@@ -14,7 +14,7 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional
 
 from ..scheduling.calculator import advance_rotation, next_due_after_completion
@@ -22,17 +22,32 @@ from .connection import get_connection
 from .errors import StoreError
 
 
+# De twee vragen achter elke voortgangsberekening; beide lopen over
+# idx_completions_chore_time (chore_id, completed_at).
+_INSTANCE_START_SQL = (
+    "SELECT MAX(completed_at) FROM completions"
+    " WHERE chore_id = ? AND is_full_completion = 1")
+_INSTANCE_ROWS_SQL = (
+    "SELECT subtask_id, minutes FROM completions"
+    " WHERE chore_id = ? AND completed_at > ?")
+
+
 def week_start(day: date) -> date:
     """Maandag van de week waar `day` in valt (§5.2)."""
     return day - timedelta(days=day.isoweekday() - 1)
 
 
+# Hetzelfde als week_start, maar in SQLite: zes dagen terug en dan door naar
+# de eerstvolgende maandag. Alleen het datumdeel, zodat een tijdzone-offset
+# in completed_at de dag niet naar UTC verschuift. Zo rekent SQLite de week
+# uit en groepeert hij al, in plaats van dat Python per rij een datum parst.
+_WEEK_SQL = "date(substr(completed_at, 1, 10), '-6 days', 'weekday 1')"
+
+
 def _instance_start(conn: sqlite3.Connection, chore_id: str) -> str:
     """Tijdstip van de laatste volledige voltooiing; '' als die er nooit was.
     Alles ná dit tijdstip hoort bij de lopende taakinstantie."""
-    row = conn.execute(
-        "SELECT MAX(completed_at) FROM completions"
-        " WHERE chore_id = ? AND is_full_completion = 1", (chore_id,)).fetchone()
+    row = conn.execute(_INSTANCE_START_SQL, (chore_id,)).fetchone()
     return row[0] or ""
 
 
@@ -41,9 +56,7 @@ def instance_progress(database_path: str, chore_id: str) -> dict:
     en het aantal tikken (counter), plus de al gecrediteerde minuten."""
     with get_connection(database_path) as conn:
         since = _instance_start(conn, chore_id)
-        rows = conn.execute(
-            "SELECT subtask_id, minutes FROM completions"
-            " WHERE chore_id = ? AND completed_at > ?", (chore_id, since)).fetchall()
+        rows = conn.execute(_INSTANCE_ROWS_SQL, (chore_id, since)).fetchall()
         return {
             "done_subtask_ids": [r["subtask_id"] for r in rows if r["subtask_id"]],
             "ticks": len(rows),
@@ -75,95 +88,142 @@ def complete_chore(
     (§4.4). Geeft een dict terug met alles wat nodig is om dit binnen vijf
     minuten terug te draaien (§2.3 undo).
     """
-    with get_connection(database_path) as conn:
-        row = conn.execute("SELECT * FROM chores WHERE id = ?", (chore_id,)).fetchone()
-        if row is None:
-            raise StoreError(f"onbekende taak {chore_id!r}")
-        if not row["active"]:
-            raise StoreError(f"taak {chore_id!r} is niet actief")
-        assignee = conn.execute(
-            "SELECT id FROM assignees WHERE id = ? AND active = 1", (assignee_id,)).fetchone()
-        if assignee is None:
-            raise StoreError(f"onbekende of inactieve persoon {assignee_id!r}")
-
-        duration = row["duration_minutes"]
-        mode = row["subtask_mode"]
-        since = _instance_start(conn, chore_id)
-        instance_rows = conn.execute(
-            "SELECT subtask_id, minutes FROM completions"
-            " WHERE chore_id = ? AND completed_at > ?", (chore_id, since)).fetchall()
-        credited = sum(r["minutes"] for r in instance_rows)
-
-        if mode == "checklist" and subtask_id is not None:
-            subtasks = conn.execute(
-                "SELECT id FROM subtasks WHERE chore_id = ?", (chore_id,)).fetchall()
-            valid_ids = {r["id"] for r in subtasks}
-            if subtask_id not in valid_ids:
-                raise StoreError(f"deeltaak {subtask_id} hoort niet bij {chore_id!r}")
-            done_ids = {r["subtask_id"] for r in instance_rows if r["subtask_id"]}
-            if subtask_id in done_ids:
-                raise StoreError("deeltaak is al afgevinkt in deze ronde")
-            total = len(valid_ids)
-            # >= vangt het geval dat de lijst tussentijds is ingekort
-            was_full = len(done_ids) + 1 >= total
-            share = duration // total
-            minutes = max(0, duration - credited) if was_full else share
-        elif mode == "counter" and subtask_id is None:
-            target = row["subtask_target"] or 1
-            ticks = len(instance_rows)
-            # de doeltik sluit de ronde; een tik daarna begint vanzelf een
-            # nieuwe ronde, want _instance_start schuift mee. >= vangt een
-            # tussentijds verlaagd doel.
-            was_full = ticks + 1 >= target
-            share = duration // target
-            minutes = max(0, duration - credited) if was_full else share
-        elif subtask_id is not None:
-            raise StoreError(f"taak {chore_id!r} heeft geen deeltaken van dit type")
-        else:
-            # gewone taak, of een checklist/counter in één keer afronden
-            was_full = True
-            minutes = max(0, duration - credited)
-
-        cursor = conn.execute(
-            "INSERT INTO completions (chore_id, subtask_id, is_full_completion,"
-            " assignee_id, completed_at, minutes, note) VALUES (?,?,?,?,?,?,?)",
-            (chore_id, subtask_id, 1 if was_full else 0,
-             assignee_id, now_iso, minutes, note))
-        undo = {
-            "row_id": cursor.lastrowid,
-            "chore_id": chore_id,
-            "was_full": was_full,
-            "completed_at": now_iso,
-            "prev_next_due": row["next_due"],
-            "prev_rotation_index": row["rotation_index"],
-            "new_next_due": row["next_due"],
-        }
-        if was_full:
-            new_due = next_due_after_completion(
-                row["schedule_type"], json.loads(row["schedule_config"]), today)
-            rotation = json.loads(row["rotation"])
-            # §4.4: de beurt schuift door vanaf wie de taak écht deed — niet
-            # vanaf wie aan de beurt stond. Een doener buiten de rotatielijst
-            # laat de beurt staan.
-            new_index = (advance_rotation(rotation, row["rotation_index"], assignee_id)
-                         if row["assignment_type"] == "rotating" else row["rotation_index"])
-            conn.execute(
-                "UPDATE chores SET next_due = ?, rotation_index = ?, updated_at = ?"
-                " WHERE id = ?",
-                (new_due.isoformat(), new_index, now_iso, chore_id))
-            undo["new_next_due"] = new_due.isoformat()
-        return undo
+    with get_connection(database_path, immediate=True) as conn:
+        return _complete(conn, chore_id, assignee_id, today, now_iso,
+                         subtask_id, note)
+
+
+def complete_chores(
+    database_path: str, items: list[dict], today: date, now_iso: str,
+) -> list[dict]:
+    """Meerdere afvinkingen in één verbinding en één transactie.
+
+    Elk item is een dict met chore_id, assignee_id en optioneel subtask_id
+    en note; de regels zijn die van complete_chore, in de gegeven volgorde.
+    Alles of niets: één ongeldig item en er wordt niets vastgelegd. Geeft de
+    undo-dicts terug in dezelfde volgorde.
+
+    Elk item krijgt een eigen, strikt oplopend tijdstip (een microseconde
+    per stap): een ronde begint ná de laatste volledige voltooiing, dus met
+    één gedeeld tijdstip zou een tik of deelstap ná een volle ronde van
+    dezelfde taak buiten de nieuwe ronde vallen.
+    """
+    start = datetime.fromisoformat(now_iso)
+    with get_connection(database_path, immediate=True) as conn:
+        return [
+            _complete(conn, item["chore_id"], item["assignee_id"], today,
+                      (start + timedelta(microseconds=i)).isoformat() if i else now_iso,
+                      item.get("subtask_id"), item.get("note"))
+            for i, item in enumerate(items)
+        ]
+
+
+def _complete(
+    conn: sqlite3.Connection,
+    chore_id: str,
+    assignee_id: str,
+    today: date,
+    now_iso: str,
+    subtask_id: Optional[int],
+    note: Optional[str],
+) -> dict:
+    """De kern van complete_chore, op een open verbinding."""
+    row = conn.execute("SELECT * FROM chores WHERE id = ?", (chore_id,)).fetchone()
+    if row is None:
+        raise StoreError(f"onbekende taak {chore_id!r}")
+    if not row["active"]:
+        raise StoreError(f"taak {chore_id!r} is niet actief")
+    assignee = conn.execute(
+        "SELECT id FROM assignees WHERE id = ? AND active = 1", (assignee_id,)).fetchone()
+    if assignee is None:
+        raise StoreError(f"onbekende of inactieve persoon {assignee_id!r}")
+
+    duration = row["duration_minutes"]
+    mode = row["subtask_mode"]
+    since = _instance_start(conn, chore_id)
+    instance_rows = conn.execute(_INSTANCE_ROWS_SQL, (chore_id, since)).fetchall()
+    credited = sum(r["minutes"] for r in instance_rows)
+
+    if mode == "checklist" and subtask_id is not None:
+        subtasks = conn.execute(
+            "SELECT id FROM subtasks WHERE chore_id = ?", (chore_id,)).fetchall()
+        valid_ids = {r["id"] for r in subtasks}
+        if subtask_id not in valid_ids:
+            raise StoreError(f"deeltaak {subtask_id} hoort niet bij {chore_id!r}")
+        done_ids = {r["subtask_id"] for r in instance_rows if r["subtask_id"]}
+        if subtask_id in done_ids:
+            raise StoreError("deeltaak is al afgevinkt in deze ronde")
+        total = len(valid_ids)
+        # >= vangt het geval dat de lijst tussentijds is ingekort
+        was_full = len(done_ids) + 1 >= total
+        share = duration // total
+        minutes = max(0, duration - credited) if was_full else share
+    elif mode == "counter" and subtask_id is None:
+        target = row["subtask_target"] or 1
+        ticks = len(instance_rows)
+        # de doeltik sluit de ronde; een tik daarna begint vanzelf een
+        # nieuwe ronde, want _instance_start schuift mee. >= vangt een
+        # tussentijds verlaagd doel.
+        was_full = ticks + 1 >= target
+        share = duration // target
+        minutes = max(0, duration - credited) if was_full else share
+    elif subtask_id is not None:
+        raise StoreError(f"taak {chore_id!r} heeft geen deeltaken van dit type")
+    else:
+        # gewone taak, of een checklist/counter in één keer afronden
+        was_full = True
+        minutes = max(0, duration - credited)
+
+    cursor = conn.execute(
+        "INSERT INTO completions (chore_id, subtask_id, is_full_completion,"
+        " assignee_id, completed_at, minutes, note) VALUES (?,?,?,?,?,?,?)",
+        (chore_id, subtask_id, 1 if was_full else 0,
+         assignee_id, now_iso, minutes, note))
+    undo = {
+        "row_id": cursor.lastrowid,
+        "chore_id": chore_id,
+        "was_full": was_full,
+        "completed_at": now_iso,
+        "prev_next_due": row["next_due"],
+        "prev_rotation_index": row["rotation_index"],
+        "new_next_due": row["next_due"],
+    }
+    if was_full:
+        new_due = next_due_after_completion(
+            row["schedule_type"], json.loads(row["schedule_config"]), today)
+        rotation = json.loads(row["rotation"])
+        # §4.4: de beurt schuift door vanaf wie de taak écht deed — niet
+        # vanaf wie aan de beurt stond. Een doener buiten de rotatielijst
+        # laat de beurt staan.
+        new_index = (advance_rotation(rotation, row["rotation_index"], assignee_id)
+                     if row["assignment_type"] == "rotating" else row["rotation_index"])
+        conn.execute(
+            "UPDATE chores SET next_due = ?, rotation_index = ?, updated_at = ?"
+            " WHERE id = ?",
+            (new_due.isoformat(), new_index, now_iso, chore_id))
+        undo["new_next_due"] = new_due.isoformat()
+    return undo
 
 
 def undo_completion(database_path: str, undo: dict) -> None:
     """Draai één voltooiing terug: de regel weg, en bij een volledige
     voltooiing ook next_due en rotation_index terugzetten (§2.3)."""
+    undo_completions(database_path, [undo])
+
+
+def undo_completions(database_path: str, undos: list[dict]) -> None:
+    """Draai een reeks voltooiingen terug in één transactie, de laatste
+    eerst — zodat bij twee volle rondes van dezelfde taak de oudste
+    next_due en rotation_index als laatste teruggezet worden."""
+    newest_first = list(reversed(undos))
     with get_connection(database_path) as conn:
-        conn.execute("DELETE FROM completions WHERE id = ?", (undo["row_id"],))
-        if undo["was_full"]:
-            conn.execute(
-                "UPDATE chores SET next_due = ?, rotation_index = ? WHERE id = ?",
-                (undo["prev_next_due"], undo["prev_rotation_index"], undo["chore_id"]))
+        conn.executemany("DELETE FROM completions WHERE id = ?",
+                         [(undo["row_id"],) for undo in newest_first])
+        # executemany houdt de volgorde aan, dus de oudste wint ook hier
+        conn.executemany(
+            "UPDATE chores SET next_due = ?, rotation_index = ? WHERE id = ?",
+            [(undo["prev_next_due"], undo["prev_rotation_index"], undo["chore_id"])
+             for undo in newest_first if undo["was_full"]])
 
 
 def leaderboard(database_path: str, today: date) -> dict:
@@ -203,12 +263,12 @@ def assignee_streaks(database_path: str, today: date) -> dict:
     breekt de streak niet — dan begint het tellen bij vorige week."""
     with get_connection(database_path) as conn:
         rows = conn.execute(
-            "SELECT DISTINCT assignee_id, substr(completed_at, 1, 10) AS day"
+            f"SELECT DISTINCT assignee_id, {_WEEK_SQL} AS week"
             " FROM completions").fetchall()
     weeks_per_assignee: dict = {}
     for row in rows:
         weeks_per_assignee.setdefault(row["assignee_id"], set()).add(
-            week_start(date.fromisoformat(row["day"])))
+            date.fromisoformat(row["week"]))
     current = week_start(today)
     streaks = {}
     for assignee_id, weeks in weeks_per_assignee.items():
@@ -254,26 +314,27 @@ def week_history(database_path: str, today: date, weeks: int = 12) -> list[dict]
     current_start = week_start(today)
     with get_connection(database_path) as conn:
         rows = conn.execute(
-            "SELECT substr(co.completed_at, 1, 10) AS day, co.minutes,"
-            " co.is_full_completion, a.id AS assignee_id, a.name, a.color"
+            f"SELECT {_WEEK_SQL} AS week, a.id AS assignee_id, a.name, a.color,"
+            " SUM(co.minutes) AS minutes, SUM(co.is_full_completion) AS tasks"
             " FROM completions co JOIN assignees a ON a.id = co.assignee_id"
-            " WHERE substr(co.completed_at, 1, 10) < ?",
+            # kale kolom tegen de maandag: 'YYYY-MM-DDT…' < 'YYYY-MM-DD' is
+            # precies "vóór die dag", en zo kan idx_completions_completed_at
+            # het bereik leveren in plaats van substr() per rij
+            " WHERE co.completed_at < ?"
+            " GROUP BY week, a.id",
             (current_start.isoformat(),)).fetchall()
     per_week: dict = {}
     for row in rows:
-        start = week_start(date.fromisoformat(row["day"]))
-        persons = per_week.setdefault(start, {})
-        person = persons.setdefault(row["assignee_id"], {
+        per_week.setdefault(row["week"], []).append({
             "id": row["assignee_id"], "name": row["name"], "color": row["color"],
-            "minutes": 0, "tasks": 0,
+            "minutes": row["minutes"], "tasks": row["tasks"],
         })
-        person["minutes"] += row["minutes"]
-        person["tasks"] += row["is_full_completion"]
     history = []
+    # ISO-datums sorteren als tekst gewoon goed
     for start in sorted(per_week, reverse=True)[:weeks]:
-        persons = sorted(per_week[start].values(), key=lambda p: -p["minutes"])
+        persons = sorted(per_week[start], key=lambda p: -p["minutes"])
         history.append({
-            "week_start": start.isoformat(),
+            "week_start": start,
             "total_minutes": sum(p["minutes"] for p in persons),
             "persons": persons,
         })
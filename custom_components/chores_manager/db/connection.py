@@ -1,32 +1,122 @@
 """Verbindingslaag voor het v2-schema (fase 2a).
 
-Staat bewust naast db/base.py: base.py bedient het oude schema en wordt in
-fase 2b ontmanteld. Vanaf dan is dit de enige plek waar verbindingen vandaan
-komen. Tot die tijd importeert niets in de draaiende integratie deze module.
+De enige plek waar verbindingen vandaan komen. Verbindingen worden per
+databasepad hergebruikt: openen kost een paar syscalls plus de pragma's, en
+een verbinding die net gebruikt is heeft haar pagina-cache nog warm. De pool
+is een stapel (LIFO), zodat steeds de laatst gebruikte verbinding terugkomt;
+meer dan MAX_IDLE wachtende verbindingen worden gesloten in plaats van bewaard.
+
+Binnen één thread is get_connection herintreedbaar: een geneste aanroep
+voor hetzelfde pad krijgt de verbinding van het buitenste blok. Zo kan een
+leesronde als build_state of notification_summary alle db/-functies die hij
+aanroept over één verbinding laten lopen in plaats van per functie een
+verbinding uit de pool te halen.
 """
 from __future__ import annotations
 
 import sqlite3
+import threading
 from contextlib import contextmanager
 from typing import Iterator
 
+# Hoe lang een verbinding op een schrijfslot wacht voor hij opgeeft.
+BUSY_TIMEOUT_MS = 30_000
+
+# Zoveel ongebruikte verbindingen per pad blijven open; de executor draait
+# zelden meer db/-jobs tegelijk.
+MAX_IDLE = 4
+
+_idle: dict[str, list[sqlite3.Connection]] = {}
+_idle_lock = threading.Lock()
+
+# Per thread de verbindingen die nu in een with-blok uitstaan, per pad.
+_held = threading.local()
+
+
+def _connect(database_path: str) -> sqlite3.Connection:
+    # check_same_thread=False: de verbinding gaat via de pool van de ene
+    # executorthread naar de andere, maar nooit door twee tegelijk
+    conn = sqlite3.connect(
+        database_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
 
 @contextmanager
-def get_connection(database_path: str) -> Iterator[sqlite3.Connection]:
-    """Open een verbinding met rijen als sqlite3.Row en foreign keys aan.
+def get_connection(
+    database_path: str, immediate: bool = False,
+) -> Iterator[sqlite3.Connection]:
+    """Geef een verbinding met rijen als sqlite3.Row en foreign keys aan.
 
     Commit bij normaal verlaten van het with-blok, rollback bij een exception.
     SQLite dwingt foreign keys alleen af als de pragma per verbinding aanstaat;
     vergeet je dat, dan slikt hij verwijzingen naar niet-bestaande rijen.
+
+    Panel, rol en meldingen kunnen tegelijk schrijven: een bezette database
+    wacht tot BUSY_TIMEOUT_MS in plaats van meteen "database is locked" te
+    geven. synchronous=NORMAL is onder WAL (aangezet in create_database)
+    veilig tegen corruptie en scheelt een fsync per commit.
+
+    immediate=True is voor lezen-dan-schrijven (afvinken, deeltaken): het
+    blok begint met BEGIN IMMEDIATE en houdt het schrijfslot vanaf de eerste
+    SELECT. Zonder dat opent sqlite3 pas bij de eerste write een transactie,
+    en kan een andere schrijver tussen de controle en de write door glippen.
+
+    Genest binnen een ander blok voor hetzelfde pad (zelfde thread) krijg je
+    diezelfde verbinding; committen of terugrollen doet alleen het
+    buitenste blok.
     """
-    conn = sqlite3.connect(database_path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    held = _held.__dict__.setdefault("conns", {})
+    outer = held.get(database_path)
+    if outer is not None:
+        if immediate and not outer.in_transaction:
+            outer.execute("BEGIN IMMEDIATE")
+        yield outer
+        return
+    with _idle_lock:
+        stack = _idle.get(database_path)
+        conn = stack.pop() if stack else None
+    if conn is None:
+        conn = _connect(database_path)
+    held[database_path] = conn
     try:
+        if immediate:
+            conn.execute("BEGIN IMMEDIATE")
         yield conn
         conn.commit()
     except Exception:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            # een verbinding die niet eens terug kan rollen, gaat niet terug
+            # de pool in
+            conn.close()
+        else:
+            _release(database_path, conn)
         raise
+    else:
+        _release(database_path, conn)
     finally:
+        # ook bij een BaseException: een blijven hangende verbinding zou
+        # elke volgende aanroep op deze thread ongecommit laten
+        del held[database_path]
+
+
+def _release(database_path: str, conn: sqlite3.Connection) -> None:
+    with _idle_lock:
+        stack = _idle.setdefault(database_path, [])
+        if len(stack) < MAX_IDLE:
+            stack.append(conn)
+            return
+    conn.close()
+
+
+def close_connections(database_path: str) -> None:
+    """Sluit de wachtende verbindingen voor dit pad (bij ontladen)."""
+    with _idle_lock:
+        stack = _idle.pop(database_path, [])
+    for conn in stack:
         conn.close()
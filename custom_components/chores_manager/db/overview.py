@@ -7,10 +7,12 @@ niets anders dan deze functies in een executor aanroepen.
 from __future__ import annotations
 
 from datetime import date
+from functools import wraps
 
-from ..scheduling.calculator import current_assignee, cycle_fraction, overdue_days, urgency
+from ..scheduling.calculator import current_assignee, due_status
 from .assignees import assignee_in_use, list_assignees
-from .chores import list_chores
+from .chores import PRIORITY_RANK, list_chores, list_due_chores
+from .connection import get_connection
 from .completions import (
     assignee_streaks,
     completed_today_count,
@@ -23,15 +25,32 @@ from .completions import (
 from .subtasks import list_subtasks
 
 
+def _one_connection(func):
+    """Laat een leesronde over één verbinding lopen.
+
+    De functies hieronder roepen per taak en per persoon andere db/-functies
+    aan, elk met een eigen get_connection. Binnen dit blok krijgen die
+    allemaal dezelfde verbinding (get_connection is herintreedbaar per
+    thread): één keer uit de pool, en een warme pagina-cache over de hele
+    ronde.
+    """
+    @wraps(func)
+    def wrapper(database_path: str, *args, **kwargs):
+        with get_connection(database_path):
+            return func(database_path, *args, **kwargs)
+    return wrapper
+
+
 def enrich_chore(database_path: str, chore: dict, today: date) -> dict:
     """Berekende velden bij een taak: achterstand, urgentie, wie aan de beurt
     is, en de voortgang van de lopende instantie."""
     due = date.fromisoformat(chore["next_due"])
     enriched = dict(chore)
-    enriched["overdue_days"] = overdue_days(due, today)
-    enriched["urgency"] = urgency(due, chore["priority"], today)
-    enriched["cycle_fraction"] = cycle_fraction(
-        chore["schedule_type"], chore["schedule_config"], due, today)
+    status = due_status(chore["schedule_type"], chore["schedule_config"],
+                        chore["priority"], due, today)
+    enriched["overdue_days"] = status.overdue_days
+    enriched["urgency"] = status.urgency
+    enriched["cycle_fraction"] = status.cycle_fraction
     if chore["assignment_type"] == "fixed":
         enriched["current_assignee"] = chore["assigned_to"]
     elif chore["assignment_type"] == "rotating":
@@ -55,6 +74,13 @@ def enrich_chore(database_path: str, chore: dict, today: date) -> dict:
 _TASKS_TODAY_LIMIT = 8
 
 
+def _overdue_key(chore: dict) -> tuple:
+    """Sorteersleutel voor achterstand: hoogste cyclusfractie eerst, bij
+    gelijke stand op vervaldatum en naam. Expliciet, zodat de volgorde niet
+    afhangt van de query die de taken aanleverde."""
+    return (-(chore["cycle_fraction"] or 0), chore["next_due"], chore["name"])
+
+
 def _tasks_today(chores: list[dict], assignees_by_id: dict) -> list[dict]:
     """Compacte weergavelijst voor Lovelace (fase 5, stap B): wat er vandaag
     speelt mét wie het moet doen. Puur weergave — geen ids, geen
@@ -73,18 +99,22 @@ def _tasks_today(chores: list[dict], assignees_by_id: dict) -> list[dict]:
 
     vandaag = sorted(
         (c for c in chores if c["urgency"] == "due"),
-        key=lambda c: (_PRIORITY_RANK.get(c["priority"], 9), c["name"]))
+        key=lambda c: (PRIORITY_RANK.get(c["priority"], len(PRIORITY_RANK)),
+                       c["name"]))
     achter = sorted(
         (c for c in chores if c["overdue_days"] > 0),
-        key=lambda c: -(c["cycle_fraction"] or 0))
+        key=_overdue_key)
     return ([rij(c, "today") for c in vandaag]
             + [rij(c, "overdue") for c in achter])[:_TASKS_TODAY_LIMIT]
 
 
+@_one_connection
 def overview(database_path: str, today: date) -> dict:
     """De samenvatting van §2.4: sensortoestand plus attributen."""
+    # Tellingen en tasks_today gaan alleen over vandaag en achterstand;
+    # taken die nog moeten komen hoeven dus niet verrijkt te worden.
     chores = [enrich_chore(database_path, chore, today)
-              for chore in list_chores(database_path)]
+              for chore in list_due_chores(database_path, today)]
     due_today = sum(1 for c in chores if c["urgency"] == "due")
     overdue = sum(1 for c in chores if c["overdue_days"] > 0)
     assignees_by_id = {a["id"]: a for a in list_assignees(database_path)}
@@ -115,9 +145,7 @@ def overview(database_path: str, today: date) -> dict:
     }
 
 
-_PRIORITY_RANK = {"critical": 0, "high": 1, "normal": 2, "low": 3}
-
-
+@_one_connection
 def notification_summary(database_path: str, today: date) -> dict:
     """Per actieve persoon wat er nú speelt, voor de ochtendmelding (§6).
 
@@ -127,25 +155,43 @@ def notification_summary(database_path: str, today: date) -> dict:
     belangrijkheid (achterstand op cyclusfractie, vandaag op prioriteit en
     dan duur), zodat pick_notify_action gewoon de kop pakt.
     """
+    # Upcoming valt toch af, dus filtert de query al op next_due <= vandaag
+    # en verrijken we alleen de rest (deeltaken en voortgang zijn per taak
+    # een query). De query levert ze al op prioriteit en duur.
     chores = [enrich_chore(database_path, chore, today)
-              for chore in list_chores(database_path)]
-    summary = {}
-    for person in list_assignees(database_path):
-        mine = [c for c in chores
-                if c["assignment_type"] == "anyone"
-                or c["current_assignee"] == person["id"]]
-        due = sorted(
-            (c for c in mine if c["urgency"] == "due"),
-            key=lambda c: (_PRIORITY_RANK.get(c["priority"], 9),
-                           c["duration_minutes"]))
-        overdue = sorted(
-            (c for c in mine if c["overdue_days"] > 0),
-            key=lambda c: -(c["cycle_fraction"] or 0))
-        summary[person["id"]] = {
-            "assignee": dict(person), "due": due, "overdue": overdue}
+              for chore in list_due_chores(database_path, today)]
+    persons = list_assignees(database_path)
+    # Eén keer over alle taken in plaats van per persoon: elke taak meteen
+    # in het bakje van wie hem moet doen (bij 'anyone' in alle bakjes).
+    due = [c for c in chores if c["urgency"] == "due"]
+    overdue = sorted(
+        (c for c in chores if c["overdue_days"] > 0),
+        key=_overdue_key)
+    # list_assignees geeft verse dicts: geen kopie nodig
+    summary = {person["id"]: {"assignee": person, "due": [], "overdue": []}
+               for person in persons}
+    for key, ordered in (("due", due), ("overdue", overdue)):
+        for chore in ordered:
+            if chore["assignment_type"] == "anyone":
+                for entry in summary.values():
+                    entry[key].append(chore)
+            elif chore["current_assignee"] in summary:
+                summary[chore["current_assignee"]][key].append(chore)
     return summary
 
 
+@_one_connection
+def weekly_summary(database_path: str, today: date) -> dict:
+    """Alles voor de weeksamenvatting (§6) in één executorsprong: de
+    ranglijst van de week, de streaks en de personen (om te bepalen wie
+    een melding krijgt)."""
+    return {
+        "leaderboard": leaderboard(database_path, today),
+        "streaks": assignee_streaks(database_path, today),
+        "assignees": list_assignees(database_path),
+    }
+
+
 def pick_notify_action(due: list, overdue: list):
     """De taak achter de ene "Klaar"-knop in de ochtendmelding.
 
@@ -162,6 +208,7 @@ def pick_notify_action(due: list, overdue: list):
     return None
 
 
+@_one_connection
 def build_state(database_path: str, today: date, feed_limit: int = 100) -> dict:
     """De volledige begintoestand voor chores_manager/state (§2.3).
 
@@ -192,11 +239,9 @@ def build_state(database_path: str, today: date, feed_limit: int = 100) -> dict:
     streaks = assignee_streaks(database_path, today)
     for person in board["persons"]:
         person["streak"] = streaks.get(person["id"], 0)
-    assignees = []
-    for person in list_assignees(database_path):
-        person = dict(person)
+    assignees = list_assignees(database_path)  # verse dicts, dus aanvullen mag
+    for person in assignees:
         person["in_use"] = assignee_in_use(database_path, person["id"])
-        assignees.append(person)
     return {
         "today": today.isoformat(),
         "chores": chores,
@@ -60,6 +60,11 @@ CREATE TABLE IF NOT EXISTS chores (
     updated_at       TIMESTAMP NOT NULL
 );
 
+-- partieel: list_chores en de nachtelijke rol lezen alleen actieve taken,
+-- op next_due en naam — de index levert ze al in die volgorde
+CREATE INDEX IF NOT EXISTS idx_chores_active_due
+    ON chores (next_due, name) WHERE active = 1;
+
 CREATE TABLE IF NOT EXISTS subtasks (
     id       INTEGER PRIMARY KEY AUTOINCREMENT,
     chore_id TEXT NOT NULL REFERENCES chores(id) ON DELETE CASCADE,
@@ -79,19 +84,31 @@ CREATE TABLE IF NOT EXISTS completions (
     minutes            INTEGER NOT NULL,   -- momentopname, geen verwijzing (§3.4)
     note               TEXT
 );
-
-CREATE INDEX IF NOT EXISTS idx_completions_completed_at
-    ON completions (completed_at);
-CREATE INDEX IF NOT EXISTS idx_completions_assignee
-    ON completions (assignee_id, completed_at);
-CREATE INDEX IF NOT EXISTS idx_completions_chore
-    ON completions (chore_id);
 """
 
+# Los van SCHEMA, omdat de herbouw van completions (_migrate_completions_fk)
+# ze binnen zijn eigen transactie opnieuw moet aanleggen: één bron voor beide.
+COMPLETIONS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_completions_completed_at"
+    " ON completions (completed_at)",
+    "CREATE INDEX IF NOT EXISTS idx_completions_assignee"
+    " ON completions (assignee_id, completed_at)",
+    # voortgang van de lopende instantie: per taak, vanaf een tijdstip
+    "CREATE INDEX IF NOT EXISTS idx_completions_chore_time"
+    " ON completions (chore_id, completed_at)",
+)
+
+
+# Verhoog bij elke nieuwe migratiestap in _migrate. PRAGMA user_version
+# onthoudt per databasebestand tot waar het gemigreerd is.
+SCHEMA_VERSION = 3
+
 
 def apply_schema(conn: sqlite3.Connection) -> None:
     """Leg het v2-schema aan op een open verbinding. Idempotent."""
     conn.executescript(SCHEMA)
+    for statement in COMPLETIONS_INDEXES:
+        conn.execute(statement)
     _migrate(conn)
 
 
@@ -101,7 +118,14 @@ def _migrate(conn: sqlite3.Connection) -> None:
     CREATE TABLE IF NOT EXISTS raakt een bestaande tabel niet aan, dus een
     kolom die later aan het schema is toegevoegd, moet hier per bestaande
     database met ALTER TABLE bijgezet worden.
+
+    Een database op SCHEMA_VERSION slaat de controles over; de stappen
+    zelf blijven idempotent, want een database van vóór de versieteller
+    begint op 0 en loopt ze dan gewoon één keer door.
     """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+
     kolommen = {row[1] for row in conn.execute("PRAGMA table_info(assignees)")}
     if "notifications_enabled" not in kolommen:
         # fase 4: meldingen aan/uit per persoon; standaard aan (§6)
@@ -110,6 +134,11 @@ def _migrate(conn: sqlite3.Connection) -> None:
 
     _migrate_completions_fk(conn)
 
+    # versie 3: idx_completions_chore (chore_id) is opgegaan in
+    # idx_completions_chore_time (chore_id, completed_at)
+    conn.execute("DROP INDEX IF EXISTS idx_completions_chore")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
 
 def _migrate_completions_fk(conn: sqlite3.Connection) -> None:
     """Fase 5 (E2): completions.subtask_id krijgt ON DELETE SET NULL.
@@ -159,12 +188,8 @@ def _migrate_completions_fk(conn: sqlite3.Connection) -> None:
             " assignee_id, completed_at, minutes, note FROM completions")
         conn.execute("DROP TABLE completions")
         conn.execute("ALTER TABLE completions_nieuw RENAME TO completions")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_completed_at"
-                     " ON completions (completed_at)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_assignee"
-                     " ON completions (assignee_id, completed_at)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_chore"
-                     " ON completions (chore_id)")
+        for statement in COMPLETIONS_INDEXES:
+            conn.execute(statement)
         conn.commit()
     except Exception:
         conn.rollback()
@@ -174,6 +199,11 @@ def _migrate_completions_fk(conn: sqlite3.Connection) -> None:
 
 
 def create_database(database_path: str) -> None:
-    """Maak (of open) een databasebestand en leg het v2-schema aan."""
+    """Maak (of open) een databasebestand en leg het v2-schema aan.
+
+    WAL blijft in het bestand staan, dus één keer per start zetten volstaat:
+    lezers (panel, sensor) blokkeren dan niet meer op een schrijver.
+    """
     with get_connection(database_path) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
         apply_schema(conn)
@@ -28,26 +28,35 @@ def set_subtasks(database_path: str, chore_id: str, names: list[str]) -> list[di
     historie én hun vinkje in de lopende ronde. Alleen wat echt verdwijnt
     wordt verwijderd, alleen wat echt nieuw is komt erbij.
     """
+    with get_connection(database_path, immediate=True) as conn:
+        write_subtasks(conn, chore_id, names)
+    return list_subtasks(database_path, chore_id)
+
+
+def write_subtasks(conn: sqlite3.Connection, chore_id: str, names: list[str]) -> None:
+    """De kern van set_subtasks, op een open verbinding — zodat save_chore
+    taak en deeltaken in één transactie kan schrijven."""
     cleaned = [n.strip() for n in names if n and n.strip()]
     if len(set(cleaned)) != len(cleaned):
         raise StoreError("elke deeltaak heeft een unieke naam nodig")
-    with get_connection(database_path) as conn:
-        existing = [(r["id"], r["name"]) for r in conn.execute(
-            "SELECT id, name FROM subtasks WHERE chore_id = ? ORDER BY position, id",
-            (chore_id,))]
-        keep = {name: sid for sid, name in existing}
-        for sid, name in existing:
-            # weg als de naam vervalt, of als dit een oude dubbele rij is
-            # (van vóór de uniekheidscheck hierboven) — per naam blijft er één
-            if name not in cleaned or keep[name] != sid:
-                # ON DELETE SET NULL laat de voltooiingen van deze stap staan
-                conn.execute("DELETE FROM subtasks WHERE id = ?", (sid,))
-        for position, name in enumerate(cleaned):
-            if name in keep:
-                conn.execute("UPDATE subtasks SET position = ? WHERE id = ?",
-                             (position, keep[name]))
-            else:
-                conn.execute(
-                    "INSERT INTO subtasks (chore_id, name, position) VALUES (?, ?, ?)",
-                    (chore_id, name, position))
-    return list_subtasks(database_path, chore_id)
+    rows = conn.execute(
+        "SELECT id, name, position FROM subtasks WHERE chore_id = ?"
+        " ORDER BY position, id", (chore_id,)).fetchall()
+    existing = [(r["id"], r["name"]) for r in rows]
+    positions = {r["id"]: r["position"] for r in rows}
+    keep = {name: sid for sid, name in existing}
+    # weg als de naam vervalt, of als dit een oude dubbele rij is (van vóór
+    # de uniekheidscheck hierboven) — per naam blijft er één. ON DELETE SET
+    # NULL laat de voltooiingen van zo'n stap staan.
+    conn.executemany("DELETE FROM subtasks WHERE id = ?", [
+        (sid,) for sid, name in existing
+        if name not in cleaned or keep[name] != sid])
+    # alleen stappen die echt verschuiven; een taak opslaan zonder de lijst
+    # te wijzigen schrijft zo geen enkele deeltaakrij
+    conn.executemany("UPDATE subtasks SET position = ? WHERE id = ?", [
+        (position, keep[name]) for position, name in enumerate(cleaned)
+        if name in keep and positions[keep[name]] != position])
+    conn.executemany(
+        "INSERT INTO subtasks (chore_id, name, position) VALUES (?, ?, ?)", [
+            (chore_id, name, position) for position, name in enumerate(cleaned)
+            if name not in keep])
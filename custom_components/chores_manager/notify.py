@@ -16,35 +16,31 @@ uit data.actions en vuurt bij het tikken een event
 ``mobile_app_notification_action`` met daarin onze action-string. Taak en
 ontvanger zitten in die string gecodeerd:
 ``chores_manager_complete:<chore_id>:<assignee_id>`` (ids zijn slugs zonder
-dubbele punt). De listener hieronder vangt het event, vinkt af via dezelfde
-db-functie als het panel, vult dezelfde undo-buffer en stuurt hetzelfde
-dispatchersignaal — het panel ziet het dus direct (push) en de minuten staan
-op naam van de ontvanger van de melding.
+dubbele punt). De listener hieronder vangt het event en vinkt af via
+websocket.async_complete, dezelfde functie als het panel: zelfde db-functie,
+zelfde undo-buffer, zelfde dispatchersignaal — het panel ziet het dus direct
+(push) en de minuten staan op naam van de ontvanger van de melding.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
-import time
+from datetime import date
 
 from homeassistant.core import Event, HomeAssistant, callback
-from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.event import async_track_time_change
 from homeassistant.util import dt as dt_util
 
 from .const import (
-    DATA_UNDO,
-    DOMAIN,
     MORNING_HOUR,
     MORNING_MINUTE,
     NOTIFY_ACTION_PREFIX,
-    SIGNAL_UPDATED,
     WEEKLY_DAY,
     WEEKLY_HOUR,
     WEEKLY_MINUTE,
 )
-from .db.assignees import list_assignees
-from .db.completions import assignee_streaks, complete_chore, leaderboard
-from .db.overview import notification_summary, pick_notify_action
+from .db.overview import notification_summary, pick_notify_action, weekly_summary
+from .websocket import async_complete
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -149,75 +145,89 @@ async def _send(hass: HomeAssistant, notify_service: str, payload: dict) -> None
     await hass.services.async_call("notify", target, payload, blocking=False)
 
 
+async def _send_all(hass: HomeAssistant, berichten: list[tuple[str, dict]]) -> int:
+    """Verstuur (notify_service, payload)-paren tegelijk in plaats van na
+    elkaar. Een mislukte melding (bv. een verdwenen notify-service) houdt
+    de rest niet tegen; die komt in de log. Geeft het aantal geslaagde
+    terug."""
+    uitkomsten = await asyncio.gather(
+        *(_send(hass, service, payload) for service, payload in berichten),
+        return_exceptions=True)
+    verzonden = 0
+    for (service, _payload), uitkomst in zip(berichten, uitkomsten):
+        if isinstance(uitkomst, Exception):
+            _LOGGER.warning("Chores Manager: melding via %s mislukt: %s",
+                            service, uitkomst)
+        else:
+            verzonden += 1
+    return verzonden
+
+
 def _wil_meldingen(persoon: dict) -> bool:
     """Alleen wie een service heeft én meldingen aan (§6: per persoon)."""
     return bool(persoon.get("notify_service")
                 and persoon.get("notifications_enabled", 1))
 
 
-async def async_send_daily(hass: HomeAssistant, database_path: str) -> int:
+async def async_send_daily(
+    hass: HomeAssistant, database_path: str, today: date | None = None,
+) -> int:
     """Ochtendmelding per persoon; alleen als er voor die persoon iets is.
 
     Geeft het aantal verzonden meldingen terug (handig voor de logregel van
-    de tijdelijke testservice).
+    de tijdelijke testservice). `today` komt mee van de tijdtrigger; zonder
+    (de testservice) vraagt hij de klok zelf.
     """
-    today = dt_util.now().date()
+    today = today or dt_util.now().date()
     summary = await hass.async_add_executor_job(
         notification_summary, database_path, today)
-    verzonden = 0
+    berichten = []
     for entry in summary.values():
         persoon = entry["assignee"]
         if not _wil_meldingen(persoon):
             continue
         payload = _daily_payload(entry)
-        if not payload:
-            continue
-        await _send(hass, persoon["notify_service"], payload)
-        verzonden += 1
+        if payload:
+            berichten.append((persoon["notify_service"], payload))
+    verzonden = await _send_all(hass, berichten)
     if verzonden:
         _LOGGER.info("Chores Manager: ochtendmelding naar %d personen", verzonden)
     return verzonden
 
 
-async def async_send_weekly(hass: HomeAssistant, database_path: str) -> int:
+async def async_send_weekly(
+    hass: HomeAssistant, database_path: str, today: date | None = None,
+) -> int:
     """Weeksamenvatting naar iedereen met een service; de feiten van de week."""
-    today = dt_util.now().date()
-    board = await hass.async_add_executor_job(leaderboard, database_path, today)
-    streaks = await hass.async_add_executor_job(
-        assignee_streaks, database_path, today)
-    assignees = await hass.async_add_executor_job(list_assignees, database_path)
-    message = _weekly_message(board, streaks)
-    verzonden = 0
-    for persoon in filter(_wil_meldingen, assignees):
-        await _send(hass, persoon["notify_service"], {
-            "title": "De week in het huishouden",
-            "message": message,
-            "data": {"tag": "chores_manager_weekly"},
-        })
-        verzonden += 1
+    today = today or dt_util.now().date()
+    week = await hass.async_add_executor_job(weekly_summary, database_path, today)
+    # voor iedereen dezelfde tekst: één payload, gedeeld door alle sends
+    # (notify leest hem alleen)
+    payload = {
+        "title": "De week in het huishouden",
+        "message": _weekly_message(week["leaderboard"], week["streaks"]),
+        "data": {"tag": "chores_manager_weekly"},
+    }
+    verzonden = await _send_all(hass, [
+        (persoon["notify_service"], payload)
+        for persoon in filter(_wil_meldingen, week["assignees"])
+    ])
     if verzonden:
         _LOGGER.info("Chores Manager: weeksamenvatting naar %d personen", verzonden)
     return verzonden
 
 
 async def _async_complete_from_action(
-    hass: HomeAssistant, database_path: str, chore_id: str, assignee_id: str,
+    hass: HomeAssistant, chore_id: str, assignee_id: str,
 ) -> None:
-    """Afvinken zoals het panel het doet: zelfde db-functie, zelfde
-    undo-buffer, zelfde signaal."""
-    now = dt_util.now()
+    """Afvinken zoals het panel het doet: letterlijk dezelfde functie."""
     try:
-        undo = await hass.async_add_executor_job(
-            complete_chore, database_path, chore_id, assignee_id,
-            now.date(), now.isoformat(), None, None)
+        await async_complete(hass, chore_id, assignee_id)
     except ValueError as err:
         _LOGGER.warning(
             "Chores Manager: afvinken via melding mislukt (%s door %s): %s",
             chore_id, assignee_id, err)
         return
-    hass.data[DOMAIN][DATA_UNDO] = {"undo": undo, "at": time.monotonic()}
-    async_dispatcher_send(hass, SIGNAL_UPDATED,
-                          {"reason": "complete", "chore_id": chore_id})
     _LOGGER.info("Chores Manager: %s afgevinkt via melding door %s",
                  chore_id, assignee_id)
 
@@ -227,13 +237,15 @@ def async_setup_notifications(hass: HomeAssistant, database_path: str):
     """Zet de twee tijdstippen en de action-listener op; geeft één
     opruimfunctie terug."""
 
+    # De trigger geeft zijn eigen tijdstip mee (lokale tijd); dat is de klok
+    # voor de hele ronde, in plaats van er daarna nog eens naar te vragen.
     async def _morgen(now) -> None:
-        await async_send_daily(hass, database_path)
+        await async_send_daily(hass, database_path, now.date())
 
     async def _zondagavond(now) -> None:
         # async_track_time_change kent geen weekdag; zelf filteren.
-        if dt_util.now().weekday() == WEEKLY_DAY:
-            await async_send_weekly(hass, database_path)
+        if now.weekday() == WEEKLY_DAY:
+            await async_send_weekly(hass, database_path, now.date())
 
     async def _on_action(event: Event) -> None:
         action = event.data.get("action")
@@ -244,7 +256,7 @@ def async_setup_notifications(hass: HomeAssistant, database_path: str):
         if len(parts) != 3:
             _LOGGER.warning("Chores Manager: onleesbare action-string: %s", action)
             return
-        await _async_complete_from_action(hass, database_path, parts[1], parts[2])
+        await _async_complete_from_action(hass, parts[1], parts[2])
 
     unsubs = [
         async_track_time_change(
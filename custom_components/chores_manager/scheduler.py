@@ -7,6 +7,7 @@ uit §6 komen hier in fase 4 bij.
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.dispatcher import async_dispatcher_send
@@ -14,16 +15,20 @@ from homeassistant.helpers.event import async_track_time_change
 from homeassistant.util import dt as dt_util
 
 from .db.chores import roll_all_forward
-from .const import SIGNAL_UPDATED
+from .const import DATA_WRITE_LOCK, DOMAIN, SIGNAL_UPDATED
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_run_roll(hass: HomeAssistant, database_path: str) -> list:
-    """Voer de rol nu uit; ook aangeroepen door de service v2_roll."""
-    now = dt_util.now()
-    changes = await hass.async_add_executor_job(
-        roll_all_forward, database_path, now.date(), now.isoformat())
+async def async_run_roll(
+    hass: HomeAssistant, database_path: str, now: datetime | None = None,
+) -> list:
+    """Voer de rol nu uit; ook aangeroepen door de service v2_roll. `now`
+    komt mee van de tijdtrigger; zonder (de service) vraagt hij de klok."""
+    now = now or dt_util.now()
+    async with hass.data[DOMAIN][DATA_WRITE_LOCK]:
+        changes = await hass.async_add_executor_job(
+            roll_all_forward, database_path, now.date(), now.isoformat())
     if changes:
         _LOGGER.info("Chores Manager: nachtelijke rol verschoof %d taken: %s",
                      len(changes), changes)
@@ -37,6 +42,6 @@ async def async_run_roll(hass: HomeAssistant, database_path: str) -> list:
 def async_setup_scheduler(hass: HomeAssistant, database_path: str):
     """Plan de rol dagelijks om 03:00 lokale tijd. Geeft de unsubscribe terug."""
     async def _nightly(now) -> None:
-        await async_run_roll(hass, database_path)
+        await async_run_roll(hass, database_path, now)
 
     return async_track_time_change(hass, _nightly, hour=3, minute=0, second=0)
@@ -13,12 +13,14 @@ from .types import (
 from .calculator import (
     cycle_fraction,
     DUE,
+    DueStatus,
     GRACE,
     GRACE_DAYS,
     UPCOMING,
     URGENT,
     advance_rotation,
     current_assignee,
+    due_status,
     initial_next_due,
     next_due_after_completion,
     overdue_days,
@@ -31,5 +33,6 @@ __all__ = [
     "ScheduleError", "parse_schedule_config", "validate_schedule",
     "UPCOMING", "DUE", "GRACE", "URGENT", "GRACE_DAYS",
     "initial_next_due", "next_due_after_completion", "roll_forward",
-    "overdue_days", "cycle_fraction", "urgency", "current_assignee", "advance_rotation",
+    "overdue_days", "cycle_fraction", "urgency", "DueStatus", "due_status",
+    "current_assignee", "advance_rotation",
 ]
@@ -19,6 +19,8 @@ from __future__ import annotations
 
 import calendar
 from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple
 
 from .types import (
     DAILY,
@@ -42,42 +44,90 @@ URGENT = "urgent"      # over tijd, coulance voorbij — nadrukkelijk
 
 # --- kalenderrooster -------------------------------------------------------
 
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _last_day(year: int, month: int) -> int:
+    # wat calendar.monthrange(...)[1] geeft, zonder ook de weekdag van de
+    # eerste van de maand uit te rekenen
+    if month == 2 and calendar.isleap(year):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
 def _clamped(year: int, month: int, day: int) -> date:
     """Datum in (year, month), afgekapt op de laatste dag van die maand."""
-    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+    return date(year, month, min(day, _last_day(year, month)))
+
+
+@lru_cache(maxsize=128)
+def _weekday_mask(weekdays: tuple) -> int:
+    """Weekdagen (ma=1 … zo=7) als bitmasker: bit 0 is maandag. Er zijn
+    maar 127 combinaties, dus elk masker wordt één keer opgebouwd."""
+    mask = 0
+    for day in weekdays:
+        mask |= 1 << (day - 1)
+    return mask
+
+
+def _offset_to_set_bit(mask: int, base: int, step: int):
+    """Hoeveel dagen vanaf weekdag `base` (0 = ma) in richting `step` tot
+    de eerste weekdag in `mask`; None bij een leeg masker."""
+    return next((o for o in range(7) if mask >> (base + step * o) % 7 & 1), None)
 
 
-def _next_in_weekdays(start: date, weekdays: set, strict: bool) -> date:
+# Per masker en beginweekdag de afstand vooruit en achteruit, bij import
+# één keer uitgerekend (128 × 7): de stapfuncties doen een lookup in plaats
+# van een zoeklus.
+_NEXT_OFFSET = tuple(tuple(_offset_to_set_bit(mask, base, 1) for base in range(7))
+                     for mask in range(128))
+_PREV_OFFSET = tuple(tuple(_offset_to_set_bit(mask, base, -1) for base in range(7))
+                     for mask in range(128))
+
+
+def _next_in_weekdays(start: date, mask: int, strict: bool) -> date:
     day = start + timedelta(days=1) if strict else start
-    for offset in range(7):
-        candidate = day + timedelta(days=offset)
-        if candidate.isoweekday() in weekdays:
-            return candidate
-    raise ScheduleError("geen geldige weekdag gevonden")  # onbereikbaar na validatie
+    offset = _NEXT_OFFSET[mask][day.isoweekday() - 1]
+    if offset is None:
+        raise ScheduleError("geen geldige weekdag gevonden")  # onbereikbaar na validatie
+    return day + timedelta(days=offset)
+
+
+def _prev_in_weekdays(start: date, mask: int) -> date:
+    offset = _PREV_OFFSET[mask][start.isoweekday() - 1]
+    if offset is None:
+        raise ScheduleError("geen geldige weekdag gevonden")
+    return start - timedelta(days=offset)
+
+
+def _next_weekday(start: date, weekday: int, strict: bool) -> date:
+    # één weekdag: de afstand is gewoon modulo 7 — 0..6, of 1..7 bij strict
+    return start + timedelta(days=(weekday - start.isoweekday() - strict) % 7 + strict)
+
+
+def _prev_weekday(start: date, weekday: int) -> date:
+    return start - timedelta(days=(start.isoweekday() - weekday) % 7)
 
 
-def _prev_in_weekdays(start: date, weekdays: set) -> date:
-    for offset in range(7):
-        candidate = start - timedelta(days=offset)
-        if candidate.isoweekday() in weekdays:
-            return candidate
-    raise ScheduleError("geen geldige weekdag gevonden")
+def _add_months(year: int, month: int, months: int) -> tuple[int, int]:
+    """(jaar, maand) `months` maanden verder (negatief mag); divmod over een
+    doorlopende maandtelling doet de jaarwissel."""
+    year, index = divmod(year * 12 + month - 1 + months, 12)
+    return year, index + 1
 
 
 def _next_monthly(start: date, monthday: int, strict: bool) -> date:
     candidate = _clamped(start.year, start.month, monthday)
     if candidate > start or (not strict and candidate == start):
         return candidate
-    year, month = (start.year + 1, 1) if start.month == 12 else (start.year, start.month + 1)
-    return _clamped(year, month, monthday)
+    return _clamped(*_add_months(start.year, start.month, 1), monthday)
 
 
 def _prev_monthly(start: date, monthday: int) -> date:
     candidate = _clamped(start.year, start.month, monthday)
     if candidate <= start:
         return candidate
-    year, month = (start.year - 1, 12) if start.month == 1 else (start.year, start.month - 1)
-    return _clamped(year, month, monthday)
+    return _clamped(*_add_months(start.year, start.month, -1), monthday)
 
 
 def _next_yearly(start: date, month: int, day: int, strict: bool) -> date:
@@ -94,28 +144,35 @@ def _prev_yearly(start: date, month: int, day: int) -> date:
     return _clamped(start.year - 1, month, day)
 
 
+# Kalendertype → stapfunctie, één keer opgebouwd; _next_occurrence en
+# _prev_occurrence doen dan één dict-lookup in plaats van een if-keten.
+_NEXT_OCCURRENCE = {
+    DAILY: lambda start, cfg, strict: _next_in_weekdays(
+        start, _weekday_mask(tuple(cfg["weekdays"])), strict),
+    WEEKLY: lambda start, cfg, strict: _next_weekday(start, cfg["weekday"], strict),
+    MONTHLY: lambda start, cfg, strict: _next_monthly(start, cfg["monthday"], strict),
+    YEARLY: lambda start, cfg, strict: _next_yearly(start, cfg["month"], cfg["day"], strict),
+}
+_PREV_OCCURRENCE = {
+    DAILY: lambda start, cfg: _prev_in_weekdays(start, _weekday_mask(tuple(cfg["weekdays"]))),
+    WEEKLY: lambda start, cfg: _prev_weekday(start, cfg["weekday"]),
+    MONTHLY: lambda start, cfg: _prev_monthly(start, cfg["monthday"]),
+    YEARLY: lambda start, cfg: _prev_yearly(start, cfg["month"], cfg["day"]),
+}
+
+
 def _next_occurrence(schedule_type: str, cfg: dict, start: date, strict: bool) -> date:
-    if schedule_type == DAILY:
-        return _next_in_weekdays(start, set(cfg["weekdays"]), strict)
-    if schedule_type == WEEKLY:
-        return _next_in_weekdays(start, {cfg["weekday"]}, strict)
-    if schedule_type == MONTHLY:
-        return _next_monthly(start, cfg["monthday"], strict)
-    if schedule_type == YEARLY:
-        return _next_yearly(start, cfg["month"], cfg["day"], strict)
-    raise ScheduleError(f"{schedule_type} heeft geen kalenderrooster")
+    step = _NEXT_OCCURRENCE.get(schedule_type)
+    if step is None:
+        raise ScheduleError(f"{schedule_type} heeft geen kalenderrooster")
+    return step(start, cfg, strict)
 
 
 def _prev_occurrence(schedule_type: str, cfg: dict, start: date) -> date:
-    if schedule_type == DAILY:
-        return _prev_in_weekdays(start, set(cfg["weekdays"]))
-    if schedule_type == WEEKLY:
-        return _prev_in_weekdays(start, {cfg["weekday"]})
-    if schedule_type == MONTHLY:
-        return _prev_monthly(start, cfg["monthday"])
-    if schedule_type == YEARLY:
-        return _prev_yearly(start, cfg["month"], cfg["day"])
-    raise ScheduleError(f"{schedule_type} heeft geen kalenderrooster")
+    step = _PREV_OCCURRENCE.get(schedule_type)
+    if step is None:
+        raise ScheduleError(f"{schedule_type} heeft geen kalenderrooster")
+    return step(start, cfg)
 
 
 # --- vervaldatums (§4.2) ---------------------------------------------------
@@ -179,7 +236,10 @@ def cycle_fraction(schedule_type: str, config: dict, next_due: date, today: date
     erna. Alleen voor volgorde; de urgentiedrempels van §4.3 blijven op dagen.
     """
     cfg = validate_schedule(schedule_type, config)
-    over = (today - next_due).days
+    return _cycle_fraction(schedule_type, cfg, next_due, (today - next_due).days)
+
+
+def _cycle_fraction(schedule_type: str, cfg: dict, next_due: date, over: int) -> float:
     if over <= 0:
         return 0.0
     if schedule_type == INTERVAL:
@@ -198,9 +258,12 @@ def urgency(next_due: date, priority: str, today: date) -> str:
     Bij coulance 0 (critical) bestaat de gedempte toestand niet: één dag over
     tijd is meteen URGENT.
     """
+    return _urgency((today - next_due).days, priority)
+
+
+def _urgency(days_over: int, priority: str) -> str:
     if priority not in GRACE_DAYS:
         raise ScheduleError(f"onbekende prioriteit {priority!r}")
-    days_over = (today - next_due).days
     if days_over < 0:
         return UPCOMING
     if days_over == 0:
@@ -210,6 +273,30 @@ def urgency(next_due: date, priority: str, today: date) -> str:
     return URGENT
 
 
+class DueStatus(NamedTuple):
+    overdue_days: int
+    urgency: str
+    cycle_fraction: float
+
+
+def due_status(
+    schedule_type: str, config: dict, priority: str, next_due: date, today: date,
+) -> DueStatus:
+    """overdue_days, urgency en cycle_fraction in één keer.
+
+    Wie alle drie nodig heeft (de verrijking van elke taak in overview en
+    state) rekent het dagverschil zo één keer uit en valideert de config
+    één keer, in plaats van drie losse aanroepen die elk opnieuw beginnen.
+    """
+    cfg = validate_schedule(schedule_type, config)
+    days_over = (today - next_due).days
+    return DueStatus(
+        max(0, days_over),
+        _urgency(days_over, priority),
+        _cycle_fraction(schedule_type, cfg, next_due, days_over),
+    )
+
+
 # --- rotatie (§4.4) --------------------------------------------------------
 
 def current_assignee(rotation: list, rotation_index: int):
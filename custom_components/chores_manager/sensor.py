@@ -17,6 +17,7 @@ geen bijdragen.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from homeassistant.components.sensor import SensorEntity
@@ -57,6 +58,8 @@ class ChoresOverviewSensor(SensorEntity):
         self._database_path = database_path
         # het unique_id van de oude sensor — zie de moduledocstring
         self._attr_unique_id = f"chores_manager_{entry_id}"
+        self._refresh_task: asyncio.Task | None = None
+        self._refresh_again = False
 
     async def async_added_to_hass(self) -> None:
         self.async_on_remove(async_dispatcher_connect(
@@ -64,7 +67,20 @@ class ChoresOverviewSensor(SensorEntity):
 
     @callback
     def _handle_update(self, payload=None) -> None:
-        self.hass.async_create_task(self._refresh(write=True))
+        # Een salvo signalen (een checklist stap voor stap afvinken) wordt
+        # één herberekening plus hooguit één inhaalronde, niet één volledige
+        # overview() per signaal. De afzender wacht hier nooit op.
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_again = True
+            return
+        self._refresh_task = self.hass.async_create_background_task(
+            self._refresh_until_current(), name="chores_manager_sensor_refresh")
+
+    async def _refresh_until_current(self) -> None:
+        self._refresh_again = True
+        while self._refresh_again:
+            self._refresh_again = False
+            await self._refresh(write=True)
 
     async def async_update(self) -> None:
         # alleen de eerste keer, via update_before_add; daarna is het push
@@ -1,9 +1,10 @@
-"""De tien WS-commando's uit §2.3 (negen uit fase 2b, chore/restore uit fase 5).
+"""De elf WS-commando's uit §2.3 (negen uit fase 2b, chore/restore uit fase 5,
+complete_many voor afvinken in bulk).
 
 Authenticatie is de standaard van websocket_api: elke ingelogde gebruiker mag
 ze aanroepen, geen admin vereist — Laura en Noud moeten kunnen afvinken. Alle
 databasewerk loopt via de executor; de handlers zelf raken de database nooit
-rechtstreeks aan.
+rechtstreeks aan. Schrijvende jobs gaan via _write één voor één.
 
 Na elke mutatie gaat SIGNAL_UPDATED over de dispatcher: de v2-sensor
 ververst zichzelf en abonnees van chores_manager/subscribe krijgen een event.
@@ -12,8 +13,10 @@ events dragen alleen de reden, geen payload.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
+from functools import wraps
 
 import voluptuous as vol
 
@@ -24,28 +27,58 @@ from homeassistant.util import dt as dt_util
 
 from .const import (
     DATA_DB_PATH,
+    DATA_STATE_CACHE,
     DATA_UNDO,
+    DATA_WRITE_LOCK,
     DOMAIN,
     SIGNAL_UPDATED,
     UNDO_WINDOW_SECONDS,
 )
 from .db.assignees import delete_assignee, save_assignee
 from .db.chores import (
+    SNOOZE_MODES,
     delete_chore,
     get_chore,
     restore_chore,
     save_chore,
     snooze_chore,
 )
-from .db.completions import complete_chore, undo_completion
+from .db.completions import complete_chore, complete_chores, undo_completions
 from .db.overview import build_state
-from .db.subtasks import set_subtasks
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _path(hass: HomeAssistant) -> str:
-    return hass.data[DOMAIN][DATA_DB_PATH]
+def _run(hass: HomeAssistant, job, *args):
+    """Draai een db/-functie in de executor met het databasepad voorop.
+
+    Het pad ligt per HA-run vast; de handlers geven alleen hun eigen
+    argumenten mee, zodat de executorsprong op één plek staat.
+    """
+    return hass.async_add_executor_job(job, hass.data[DOMAIN][DATA_DB_PATH], *args)
+
+
+async def _write(hass: HomeAssistant, job, *args):
+    """Als _run, maar voor schrijvende jobs: die gaan één voor één.
+
+    Gelijktijdige schrijvers wachten anders in SQLite op elkaars slot, in
+    een executorthread die zolang niets anders kan. Lezers gaan er vrij
+    langs; onder WAL zien die gewoon de laatst gecommitte staat.
+    """
+    async with hass.data[DOMAIN][DATA_WRITE_LOCK]:
+        return await _run(hass, job, *args)
+
+
+def _store_errors(handler):
+    """Een StoreError (ValueError) uit de store-laag wordt een invalid_input-
+    fout voor de aanroeper — één keer hier, in plaats van per handler."""
+    @wraps(handler)
+    async def wrapper(hass, connection, msg):
+        try:
+            await handler(hass, connection, msg)
+        except ValueError as err:
+            connection.send_error(msg["id"], "invalid_input", str(err))
+    return wrapper
 
 
 @callback
@@ -53,35 +86,89 @@ def _notify(hass: HomeAssistant, reason: str, **extra) -> None:
     async_dispatcher_send(hass, SIGNAL_UPDATED, {"reason": reason, **extra})
 
 
+async def async_complete(
+    hass: HomeAssistant, chore_id: str, assignee_id: str,
+    subtask_id: int | None = None, note: str | None = None,
+) -> dict:
+    """Afvinken zoals panel én "Klaar"-knop het doen: de db-functie, de
+    undo-buffer en het signaal, op één plek. StoreError (een ValueError)
+    gaat ongewijzigd door naar de aanroeper."""
+    now = dt_util.now()
+    undo = await _write(
+        hass, complete_chore, chore_id, assignee_id,
+        now.date(), now.isoformat(), subtask_id, note)
+    hass.data[DOMAIN][DATA_UNDO] = {"undos": [undo], "at": time.monotonic()}
+    _notify(hass, "complete", chore_id=chore_id)
+    return undo
+
+
 @websocket_api.websocket_command({vol.Required("type"): "chores_manager/state"})
 @websocket_api.async_response
 async def ws_state(hass, connection, msg):
-    """Volledige begintoestand: taken, personen, ranglijst, feed."""
+    """Volledige begintoestand: taken, personen, ranglijst, feed.
+
+    Na elk SIGNAL_UPDATED vragen alle open panels tegelijk de staat op. De
+    eerste start de build; wie binnenkomt terwijl die loopt, wacht op
+    dezelfde build in plaats van een eigen te starten, en wie daarna komt
+    krijgt hem uit de cache. De cache geldt voor één dag en vervalt bij
+    elk signaal (_invalidate_state). Een build die tijdens een mutatie
+    liep, wordt niet bewaard en niet meer gedeeld: de generatie is dan
+    intussen opgehoogd, dus de volgende vraag start een verse.
+    """
     today = dt_util.now().date()
-    state = await hass.async_add_executor_job(build_state, _path(hass), today)
+    cache = hass.data[DOMAIN].setdefault(DATA_STATE_CACHE, {"generation": 0})
+    if cache.get("today") == today and "state" in cache:
+        connection.send_result(msg["id"], cache["state"])
+        return
+    build = cache.get("build")
+    if (build is None or build["generation"] != cache["generation"]
+            or build["today"] != today):
+        build = cache["build"] = {
+            "generation": cache["generation"],
+            "today": today,
+            "future": _run(hass, build_state, today),
+        }
+    try:
+        # shield: een panel dat wegvalt, annuleert de build niet voor de rest
+        state = await asyncio.shield(build["future"])
+    finally:
+        # pas weg als hij klaar is (ook bij een fout: dan probeert de
+        # volgende vraag opnieuw); een weggevallen wachter laat hem staan
+        if cache.get("build") is build and build["future"].done():
+            del cache["build"]
+    if cache["generation"] == build["generation"]:
+        cache.update(today=today, state=state)
     connection.send_result(msg["id"], state)
 
 
-@websocket_api.websocket_command({
-    vol.Required("type"): "chores_manager/complete",
+@callback
+def _invalidate_state(hass: HomeAssistant) -> None:
+    cache = hass.data[DOMAIN].setdefault(DATA_STATE_CACHE, {"generation": 0})
+    cache["generation"] += 1
+    cache.pop("state", None)
+
+
+# de velden van één afvinking; gedeeld door complete en complete_many, en
+# net als de andere schema's één keer bij het importeren opgebouwd
+COMPLETION_FIELDS = {
     vol.Required("chore_id"): str,
     vol.Required("assignee_id"): str,
     vol.Optional("subtask_id"): int,
     vol.Optional("note"): str,
+}
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "chores_manager/complete",
+    **COMPLETION_FIELDS,
 })
 @websocket_api.async_response
+@_store_errors
 async def ws_complete(hass, connection, msg):
     """Taak, deeltaak of counter-tik afvinken."""
-    now = dt_util.now()
-    try:
-        undo = await hass.async_add_executor_job(
-            complete_chore, _path(hass), msg["chore_id"], msg["assignee_id"],
-            now.date(), now.isoformat(), msg.get("subtask_id"), msg.get("note"))
-    except ValueError as err:
-        connection.send_error(msg["id"], "invalid_input", str(err))
-        return
-    hass.data[DOMAIN][DATA_UNDO] = {"undo": undo, "at": time.monotonic()}
-    _notify(hass, "complete", chore_id=msg["chore_id"])
+    undo = await async_complete(
+        hass, msg["chore_id"], msg["assignee_id"],
+        msg.get("subtask_id"), msg.get("note"))
     connection.send_result(msg["id"], {
         "chore_id": msg["chore_id"],
         "was_full": undo["was_full"],
@@ -90,24 +177,55 @@ async def ws_complete(hass, connection, msg):
     })
 
 
+@websocket_api.websocket_command({
+    vol.Required("type"): "chores_manager/complete_many",
+    # leeg mag niet: dat zou de undo-buffer van een eerdere afvinking wissen
+    # en zonder reden alle panels laten verversen
+    vol.Required("items"): vol.All([vol.Schema(COMPLETION_FIELDS)], vol.Length(min=1)),
+})
+@websocket_api.async_response
+@_store_errors
+async def ws_complete_many(hass, connection, msg):
+    """Meerdere afvinkingen in één executorsprong, één transactie en één
+    signaal. Alles of niets; undo draait daarna de hele reeks terug."""
+    now = dt_util.now()
+    undos = await _write(hass, complete_chores, msg["items"],
+                         now.date(), now.isoformat())
+    hass.data[DOMAIN][DATA_UNDO] = {"undos": undos, "at": time.monotonic()}
+    _notify(hass, "complete", chore_ids=[u["chore_id"] for u in undos])
+    connection.send_result(msg["id"], {
+        "completed": [
+            {"chore_id": u["chore_id"], "was_full": u["was_full"],
+             "next_due": u["new_next_due"]}
+            for u in undos
+        ],
+        "undo_available": bool(undos),
+    })
+
+
 @websocket_api.websocket_command({vol.Required("type"): "chores_manager/undo"})
 @websocket_api.async_response
 async def ws_undo(hass, connection, msg):
-    """Laatste voltooiing terugdraaien, binnen vijf minuten (§2.3).
+    """Laatste voltooiing terugdraaien, binnen vijf minuten (§2.3). Na
+    complete_many is dat de hele reeks.
 
     De buffer leeft in het geheugen; na een herstart van HA is er niets meer
     om terug te draaien. Dat past bij een venster van vijf minuten.
     """
     buffered = hass.data[DOMAIN].get(DATA_UNDO)
-    if not buffered or time.monotonic() - buffered["at"] > UNDO_WINDOW_SECONDS:
+    if (not buffered or not buffered["undos"]
+            or time.monotonic() - buffered["at"] > UNDO_WINDOW_SECONDS):
         connection.send_error(msg["id"], "nothing_to_undo",
                               "geen voltooiing om terug te draaien (venster is 5 minuten)")
         return
-    await hass.async_add_executor_job(
-        undo_completion, _path(hass), buffered["undo"])
+    undos = buffered["undos"]
+    await _write(hass, undo_completions, undos)
     hass.data[DOMAIN][DATA_UNDO] = None
-    _notify(hass, "undo", chore_id=buffered["undo"]["chore_id"])
-    connection.send_result(msg["id"], {"chore_id": buffered["undo"]["chore_id"]})
+    _notify(hass, "undo", chore_id=undos[-1]["chore_id"])
+    connection.send_result(msg["id"], {
+        "chore_id": undos[-1]["chore_id"],
+        "chore_ids": [u["chore_id"] for u in undos],
+    })
 
 
 @websocket_api.websocket_command({
@@ -115,27 +233,25 @@ async def ws_undo(hass, connection, msg):
     vol.Required("chore"): dict,
 })
 @websocket_api.async_response
+@_store_errors
 async def ws_chore_save(hass, connection, msg):
     """Taak aanmaken of bijwerken; validatie zit in de store-laag.
 
     Een optionele lijst "subtasks" (namen) in het taakobject werkt de
-    checklist-deeltaken bij. Sinds fase 5 mag dat ook mét historie: een
-    geschrapte stap laat zijn voltooiingen staan (ON DELETE SET NULL);
-    stappen met dezelfde naam behouden rij, vinkje en historie.
+    checklist-deeltaken bij, in dezelfde transactie als de taak. Sinds fase
+    5 mag dat ook mét historie: een geschrapte stap laat zijn voltooiingen
+    staan (ON DELETE SET NULL); stappen met dezelfde naam behouden rij,
+    vinkje en historie.
     """
     now = dt_util.now()
-    chore_data = dict(msg["chore"])
-    subtask_names = chore_data.pop("subtasks", None)
-    try:
-        chore = await hass.async_add_executor_job(
-            save_chore, _path(hass), chore_data, now.date(), now.isoformat())
-        if subtask_names is not None:
-            await hass.async_add_executor_job(
-                set_subtasks, _path(hass), chore["id"],
-                [str(name) for name in subtask_names])
-    except ValueError as err:
-        connection.send_error(msg["id"], "invalid_input", str(err))
-        return
+    # save_chore leest alleen de velden die hij kent; "subtasks" mag dus
+    # gewoon in het taakobject blijven staan, een kopie is niet nodig
+    subtask_names = msg["chore"].get("subtasks")
+    if subtask_names is not None:
+        subtask_names = [str(name) for name in subtask_names]
+    chore = await _write(
+        hass, save_chore, msg["chore"], now.date(), now.isoformat(),
+        subtask_names)
     _notify(hass, "chore_save", chore_id=chore["id"])
     connection.send_result(msg["id"], {"chore": chore})
 
@@ -147,8 +263,7 @@ async def ws_chore_save(hass, connection, msg):
 @websocket_api.async_response
 async def ws_chore_delete(hass, connection, msg):
     """Taak verwijderen; met historie wordt hij gedeactiveerd."""
-    result = await hass.async_add_executor_job(
-        delete_chore, _path(hass), msg["chore_id"])
+    result = await _write(hass, delete_chore, msg["chore_id"])
     _notify(hass, "chore_delete", chore_id=msg["chore_id"])
     connection.send_result(msg["id"], {"chore_id": msg["chore_id"], "result": result})
 
@@ -156,19 +271,16 @@ async def ws_chore_delete(hass, connection, msg):
 @websocket_api.websocket_command({
     vol.Required("type"): "chores_manager/chore/snooze",
     vol.Required("chore_id"): str,
-    vol.Required("mode"): vol.In(["tomorrow", "skip"]),
+    vol.Required("mode"): vol.In(SNOOZE_MODES),
 })
 @websocket_api.async_response
+@_store_errors
 async def ws_chore_snooze(hass, connection, msg):
     """Naar morgen ('tomorrow') of naar de volgende geplande keer ('skip')."""
     now = dt_util.now()
-    try:
-        new_due = await hass.async_add_executor_job(
-            snooze_chore, _path(hass), msg["chore_id"], msg["mode"],
-            now.date(), now.isoformat())
-    except ValueError as err:
-        connection.send_error(msg["id"], "invalid_input", str(err))
-        return
+    new_due = await _write(
+        hass, snooze_chore, msg["chore_id"], msg["mode"],
+        now.date(), now.isoformat())
     _notify(hass, "snooze", chore_id=msg["chore_id"])
     connection.send_result(msg["id"], {
         "chore_id": msg["chore_id"], "next_due": new_due.isoformat()})
@@ -179,16 +291,12 @@ async def ws_chore_snooze(hass, connection, msg):
     vol.Required("chore_id"): str,
 })
 @websocket_api.async_response
+@_store_errors
 async def ws_chore_restore(hass, connection, msg):
     """Gearchiveerde taak terugzetten met een verse vervaldatum (fase 5, E1)."""
     now = dt_util.now()
-    try:
-        chore = await hass.async_add_executor_job(
-            restore_chore, _path(hass), msg["chore_id"],
-            now.date(), now.isoformat())
-    except ValueError as err:
-        connection.send_error(msg["id"], "invalid_input", str(err))
-        return
+    chore = await _write(
+        hass, restore_chore, msg["chore_id"], now.date(), now.isoformat())
     _notify(hass, "chore_restore", chore_id=msg["chore_id"])
     connection.send_result(msg["id"], {"chore": chore})
 
@@ -198,14 +306,10 @@ async def ws_chore_restore(hass, connection, msg):
     vol.Required("assignee"): dict,
 })
 @websocket_api.async_response
+@_store_errors
 async def ws_assignee_save(hass, connection, msg):
     """Persoon aanmaken of bijwerken."""
-    try:
-        assignee = await hass.async_add_executor_job(
-            save_assignee, _path(hass), msg["assignee"])
-    except ValueError as err:
-        connection.send_error(msg["id"], "invalid_input", str(err))
-        return
+    assignee = await _write(hass, save_assignee, msg["assignee"])
     _notify(hass, "assignee_save", assignee_id=assignee["id"])
     connection.send_result(msg["id"], {"assignee": assignee})
 
@@ -217,8 +321,7 @@ async def ws_assignee_save(hass, connection, msg):
 @websocket_api.async_response
 async def ws_assignee_delete(hass, connection, msg):
     """Persoon verwijderen; met historie of taken wordt hij gedeactiveerd."""
-    result = await hass.async_add_executor_job(
-        delete_assignee, _path(hass), msg["assignee_id"])
+    result = await _write(hass, delete_assignee, msg["assignee_id"])
     _notify(hass, "assignee_delete", assignee_id=msg["assignee_id"])
     connection.send_result(msg["id"], {
         "assignee_id": msg["assignee_id"], "result": result})
@@ -238,7 +341,7 @@ async def ws_subscribe(hass, connection, msg):
 
 
 COMMANDS = (
-    ws_state, ws_complete, ws_undo,
+    ws_state, ws_complete, ws_complete_many, ws_undo,
     ws_chore_save, ws_chore_delete, ws_chore_snooze, ws_chore_restore,
     ws_assignee_save, ws_assignee_delete, ws_subscribe,
 )
@@ -249,4 +352,11 @@ def async_register_websocket_commands(hass: HomeAssistant) -> None:
     """Registreer de commando's (COMMANDS). Eén keer per HA-run aanroepen."""
     for command in COMMANDS:
         websocket_api.async_register_command(hass, command)
+
+    # elke mutatie, ook die van de rol, maakt de gecachte staat ongeldig
+    @callback
+    def _on_update(payload: dict) -> None:
+        _invalidate_state(hass)
+
+    async_dispatcher_connect(hass, SIGNAL_UPDATED, _on_update)
     _LOGGER.info("Chores Manager: %d WS-commando's geregistreerd", len(COMMANDS))
@@ -14,6 +14,33 @@ const MONTHS_SHORT = ['jan', 'feb', 'mrt', 'apr', 'mei', 'jun',
 const MONTHS_LONG = ['januari', 'februari', 'maart', 'april', 'mei', 'juni',
   'juli', 'augustus', 'september', 'oktober', 'november', 'december'];
 
+/** ISO-datum `days` dagen na `iso` (negatief mag). */
+function shiftIso(iso, days) {
+  const d = new Date(`${iso}T12:00:00`);
+  d.setDate(d.getDate() + days);
+  return [
+    d.getFullYear(),
+    String(d.getMonth() + 1).padStart(2, '0'),
+    String(d.getDate()).padStart(2, '0'),
+  ].join('-');
+}
+
+// Gisteren en morgen bij de laatst geziene "vandaag". dueLabel en feedWhen
+// lopen per taak en per feedregel, altijd met dezelfde todayIso; zo rekenen
+// ze die twee datums één keer per render uit in plaats van per regel.
+let neighboursOf = null;
+let neighbours = null;
+function neighbourDays(todayIso) {
+  if (todayIso !== neighboursOf) {
+    neighbours = {
+      yesterday: shiftIso(todayIso, -1),
+      tomorrow: shiftIso(todayIso, 1),
+    };
+    neighboursOf = todayIso;
+  }
+  return neighbours;
+}
+
 /** "20m", "1u", "3u 10m" — de vorm uit plan §5.1. */
 export function formatDuration(minutes) {
   const total = Math.max(0, Math.round(minutes));
@@ -45,14 +72,7 @@ export function overdueLabel(days, nextDueIso, todayIso) {
 /** Vervaldatum vooruit: "vandaag", "morgen", anders "wo 29 jul" (+jaar). */
 export function dueLabel(nextDueIso, todayIso) {
   if (nextDueIso === todayIso) return 'vandaag';
-  const tomorrow = new Date(`${todayIso}T12:00:00`);
-  tomorrow.setDate(tomorrow.getDate() + 1);
-  const tomorrowIso = [
-    tomorrow.getFullYear(),
-    String(tomorrow.getMonth() + 1).padStart(2, '0'),
-    String(tomorrow.getDate()).padStart(2, '0'),
-  ].join('-');
-  if (nextDueIso === tomorrowIso) return 'morgen';
+  if (nextDueIso === neighbourDays(todayIso).tomorrow) return 'morgen';
   const d = new Date(`${nextDueIso}T12:00:00`);
   const base = `${WEEKDAYS_SHORT[(d.getDay() + 6) % 7]} ${d.getDate()} ${MONTHS_SHORT[d.getMonth()]}`;
   if (nextDueIso.slice(0, 4) !== todayIso.slice(0, 4)) {
@@ -82,14 +102,7 @@ export function feedWhen(isoTimestamp, todayIso) {
   const datePart = isoTimestamp.slice(0, 10);
   const timePart = isoTimestamp.slice(11, 16);
   if (datePart === todayIso) return `vandaag ${timePart}`;
-  const yesterday = new Date(`${todayIso}T12:00:00`);
-  yesterday.setDate(yesterday.getDate() - 1);
-  const yesterdayIso = [
-    yesterday.getFullYear(),
-    String(yesterday.getMonth() + 1).padStart(2, '0'),
-    String(yesterday.getDate()).padStart(2, '0'),
-  ].join('-');
-  if (datePart === yesterdayIso) return `gisteren ${timePart}`;
+  if (datePart === neighbourDays(todayIso).yesterday) return `gisteren ${timePart}`;
   const d = new Date(`${datePart}T12:00:00`);
   return `${WEEKDAYS_SHORT[(d.getDay() + 6) % 7]} ${d.getDate()} ${MONTHS_SHORT[d.getMonth()]}`;
 }
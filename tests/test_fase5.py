@@ -183,6 +183,18 @@ class TestSubtasksMetHistorie:
         with pytest.raises(ValueError):
             set_subtasks(db, "kap", ["Filter", "Filter"])
 
+    def test_taak_en_deeltaken_in_een_transactie(self, db):
+        self._checklist(db)
+        data = {"id": "kap", "name": "Afzuigkap nieuw", "schedule_type": "daily",
+                "schedule_config": {"weekdays": [1, 2, 3, 4, 5, 6, 7]},
+                "subtask_mode": "checklist"}
+        with pytest.raises(ValueError):
+            save_chore(db, data, VANDAAG, NU, ["Filter", "Filter"])
+        # de ongeldige deeltaken draaien ook de taakwijziging terug
+        assert get_chore(db, "kap")["name"] == "Afzuigkap"
+        save_chore(db, data, VANDAAG, NU, ["Filter", "Lampje"])
+        assert [s["name"] for s in list_subtasks(db, "kap")] == ["Filter", "Lampje"]
+
 
 class TestMigratieSetNull:
     """De E2-migratie, expliciet op een database mét voltooiingen."""
@@ -207,6 +219,8 @@ class TestMigratieSetNull:
                 FROM completions;
             DROP TABLE completions;
             ALTER TABLE completions_oud RENAME TO completions;
+            -- een database van vóór de versieteller
+            PRAGMA user_version = 0;
         """)
         conn.commit()
         conn.close()
@@ -78,6 +78,17 @@ class TestNotificationSummary:
         assert [c["id"] for c in summary["laura"]["overdue"]] == [
             "dagelijks", "maandelijks"]
 
+    def test_gelijke_cyclusfractie_op_naam_niet_op_prioriteit(self, db):
+        # de query levert op prioriteit; bij gelijke achterstand beslist de
+        # naam, zoals vóór list_due_chores
+        _taak(db, id="zolder", name="Zolder", priority="critical",
+              next_due=VANDAAG - timedelta(days=2))
+        _taak(db, id="afwas", name="Afwas", priority="normal",
+              next_due=VANDAAG - timedelta(days=2))
+        summary = notification_summary(db, VANDAAG)
+        assert [c["id"] for c in summary["laura"]["overdue"]] == [
+            "afwas", "zolder"]
+
     def test_vandaag_gesorteerd_op_prioriteit_dan_duur(self, db):
         _taak(db, id="lang", name="Lang", priority="normal", duration_minutes=45)
         _taak(db, id="belangrijk", name="Belangrijk", priority="high",
@@ -10,8 +10,8 @@ import sqlite3
 
 import pytest
 
-from chores_manager.db.connection import get_connection
-from chores_manager.db.schema import apply_schema, create_database
+from chores_manager.db.connection import close_connections, get_connection
+from chores_manager.db.schema import SCHEMA_VERSION, apply_schema, create_database
 
 
 @pytest.fixture
@@ -30,13 +30,17 @@ def test_alle_vier_tabellen_en_indexen_bestaan(conn):
     indexen = {r[0] for r in conn.execute(
         "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")}
     assert indexen == {"idx_completions_completed_at", "idx_completions_assignee",
-                       "idx_completions_chore"}
+                       "idx_completions_chore_time", "idx_chores_active_due"}
 
 
 def test_apply_schema_is_idempotent(conn):
     apply_schema(conn)  # tweede keer mag geen fout geven
 
 
+def test_schema_versie_wordt_vastgelegd(conn):
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+
 def _insert_assignee(conn, slug="martijn"):
     conn.execute("INSERT INTO assignees (id, name, color) VALUES (?, ?, ?)",
                  (slug, slug.capitalize(), "#336699"))
@@ -101,3 +105,47 @@ class TestVerbindingslaag:
                 conn.execute(
                     "INSERT INTO completions (chore_id, assignee_id, completed_at, minutes)"
                     " VALUES ('nee', 'nee', '2026-07-28', 10)")
+
+    def test_wal_en_busy_timeout(self, tmp_path):
+        pad = str(tmp_path / "chores.db")
+        create_database(pad)
+        with get_connection(pad) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30_000
+
+    def test_verbinding_wordt_hergebruikt_tot_sluiten(self, tmp_path):
+        pad = str(tmp_path / "chores.db")
+        create_database(pad)
+        with get_connection(pad) as eerste:
+            pass
+        with get_connection(pad) as tweede:
+            assert tweede is eerste
+        close_connections(pad)
+        with get_connection(pad) as derde:
+            assert derde is not eerste
+
+    def test_genest_blok_deelt_de_buitenste_verbinding(self, tmp_path):
+        pad = str(tmp_path / "chores.db")
+        create_database(pad)
+        with pytest.raises(RuntimeError):
+            with get_connection(pad) as buiten:
+                with get_connection(pad) as binnen:
+                    assert binnen is buiten
+                    _insert_assignee(binnen)
+                # het binnenste blok commit niet; het buitenste rolt alles terug
+                raise RuntimeError("opzettelijk")
+        with get_connection(pad) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM assignees").fetchone()[0] == 0
+
+    def test_immediate_pakt_het_schrijfslot_meteen(self, tmp_path):
+        pad = str(tmp_path / "chores.db")
+        create_database(pad)
+        ander = sqlite3.connect(pad, timeout=0)
+        with get_connection(pad, immediate=True) as conn:
+            conn.execute("SELECT COUNT(*) FROM assignees").fetchone()
+            with pytest.raises(sqlite3.OperationalError):
+                ander.execute("BEGIN IMMEDIATE")
+        ander.execute("BEGIN IMMEDIATE")  # na het blok is het slot vrij
+        ander.rollback()
+        ander.close()
+
@@ -23,10 +23,13 @@ from chores_manager.db.completions import (
     week_history,
     assignee_streaks,
     complete_chore,
+    complete_chores,
     completed_today_count,
     feed,
+    instance_progress,
     leaderboard,
     undo_completion,
+    undo_completions,
     week_start,
 )
 from chores_manager.db.overview import build_state, overview
@@ -119,6 +122,59 @@ class TestCompleteEnUndo:
         assert get_chore(db, "was")["next_due"] == VANDAAG.isoformat()
         assert completed_today_count(db, VANDAAG) == 0
 
+    def test_bulk_is_alles_of_niets_en_undo_draait_reeks_terug(self, db):
+        _gewone_taak(db)
+        _gewone_taak(db, id="afwas", name="Afwas")
+        with pytest.raises(StoreError):
+            complete_chores(db, [
+                {"chore_id": "was", "assignee_id": "laura"},
+                {"chore_id": "bestaat_niet", "assignee_id": "laura"},
+            ], VANDAAG, NU)
+        assert completed_today_count(db, VANDAAG) == 0
+        undos = complete_chores(db, [
+            {"chore_id": "was", "assignee_id": "laura"},
+            {"chore_id": "afwas", "assignee_id": "martijn"},
+        ], VANDAAG, NU)
+        assert [u["chore_id"] for u in undos] == ["was", "afwas"]
+        assert completed_today_count(db, VANDAAG) == 2
+        undo_completions(db, undos)
+        assert completed_today_count(db, VANDAAG) == 0
+        assert get_chore(db, "afwas")["next_due"] == VANDAAG.isoformat()
+
+    def test_bulk_undo_van_twee_rondes_zet_de_oudste_staat_terug(self, db):
+        _gewone_taak(db)
+        undos = complete_chores(db, [
+            {"chore_id": "was", "assignee_id": "laura"},
+            {"chore_id": "was", "assignee_id": "laura"},
+        ], VANDAAG, NU)
+        undo_completions(db, undos)
+        assert get_chore(db, "was")["next_due"] == VANDAAG.isoformat()
+        assert completed_today_count(db, VANDAAG) == 0
+
+    def test_bulk_counter_over_twee_rondes(self, db):
+        # met één gedeeld tijdstip vielen de tikken na de eerste volle ronde
+        # buiten de nieuwe ronde
+        _gewone_taak(db, id="wasjes", name="Wasjes", duration_minutes=20,
+                     subtask_mode="counter", subtask_target=2)
+        undos = complete_chores(db, [
+            {"chore_id": "wasjes", "assignee_id": "laura"} for _ in range(4)
+        ], VANDAAG, NU)
+        assert [u["was_full"] for u in undos] == [False, True, False, True]
+        assert instance_progress(db, "wasjes")["ticks"] == 0
+        undo_completions(db, undos)
+        assert get_chore(db, "wasjes")["next_due"] == VANDAAG.isoformat()
+        assert instance_progress(db, "wasjes")["ticks"] == 0
+
+    def test_bulk_checklist_stap_na_volle_ronde_telt_in_nieuwe_ronde(self, db):
+        _gewone_taak(db, id="kap", name="Afzuigkap", subtask_mode="checklist")
+        set_subtasks(db, "kap", ["a", "b"])
+        a, b = (s["id"] for s in list_subtasks(db, "kap"))
+        complete_chores(db, [
+            {"chore_id": "kap", "assignee_id": "martijn", "subtask_id": sid}
+            for sid in (a, b, a)
+        ], VANDAAG, NU)
+        assert instance_progress(db, "kap")["done_subtask_ids"] == [a]
+
     def test_rotatie_schuift_alleen_bij_vol(self, db):
         save_chore(db, {
             "id": "bood", "name": "Boodschappen", "schedule_type": "weekly",
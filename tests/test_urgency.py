@@ -10,7 +10,16 @@ from datetime import date, timedelta
 
 import pytest
 
-from chores_manager.scheduling.calculator import DUE, GRACE, UPCOMING, URGENT, urgency
+from chores_manager.scheduling.calculator import (
+    DUE,
+    GRACE,
+    UPCOMING,
+    URGENT,
+    cycle_fraction,
+    due_status,
+    overdue_days,
+    urgency,
+)
 from chores_manager.scheduling.types import ScheduleError
 
 VANDAAG = date(2026, 7, 28)
@@ -62,3 +71,12 @@ class TestGrensPerPrioriteit:
 def test_onbekende_prioriteit_is_een_fout():
     with pytest.raises(ScheduleError):
         urgency(VANDAAG, "spoed", VANDAAG)
+
+
+@pytest.mark.parametrize("dagen_te_laat", [-3, 0, 1, 4, 30])
+def test_due_status_is_gelijk_aan_de_losse_functies(dagen_te_laat):
+    due = _op(dagen_te_laat)
+    config = {"weekday": 2}
+    status = due_status("weekly", config, "normal", due, VANDAAG)
+    assert status == (overdue_days(due, VANDAAG), urgency(due, "normal", VANDAAG),
+                      cycle_fraction("weekly", config, due, VANDAAG))